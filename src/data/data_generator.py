@@ -3,6 +3,9 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 
+from src.data.departure_reasons import INVOLUNTARY_REASONS, VOLUNTARY_REASONS
+from src.data.org_structure import DEFAULT_MAX_SPAN, add_org_structure
+
 # Set random seed for reproducibility
 np.random.seed(42)
 random.seed(42)
@@ -102,31 +105,23 @@ SALARY_RANGES = {
 REGIONS = ['Java', 'Sumatra', 'Kalimantan', 'Sulawesi', 'Bali & NT']
 REGION_DIST = [0.6, 0.2, 0.1, 0.05, 0.05]  # Weighted distribution toward Java
 
-# Define departure reasons by category
-VOLUNTARY_REASONS = [
-    'Better Opportunity', 
-    'Work-Life Balance', 
-    'Career Growth', 
-    'Relocation', 
-    'Education', 
-    'Personal Reasons',
-    'Retirement'
-]
-
-INVOLUNTARY_REASONS = [
-    'Performance Issue', 
-    'Reorganization', 
-    'Contract End', 
-    'Policy Violation',
-    'Misconduct'
-]
-
-def generate_employee_base(n=TOTAL_EMPLOYEES):
+def seed_generators(seed, chunk_index=0):
+    """
+    Reseed both random number generators used by the generation stages for one chunk.
+
+    The state depends on the (seed, chunk_index) pair, so chunks of one run never
+    repeat a chunk of a run with a neighbouring seed.
+    """
+    np.random.seed([seed, chunk_index])
+    random.seed(f"{seed}-{chunk_index}")
+
+def generate_employee_base(n=TOTAL_EMPLOYEES, id_offset=0):
     """Generate base employee demographic data"""
 
     data = []
 
-    for i in range(1, n+1):
+    # id_offset keeps EmployeeIDs unique when the dataset is generated in chunks
+    for i in range(id_offset + 1, id_offset + n + 1):
         employee = {
             'EmployeeID': f'EMP{i:05d}',
             'Gender': np.random.choice(['Male', 'Female'], p=[0.55, 0.45]),  # Indonesian workforce has slightly more males
@@ -595,7 +590,7 @@ def adjust_attrition_patterns(df):
                     if random.random() < 0.5:
                         df.at[idx, 'PerformanceRating'] = max(1, df.at[idx, 'PerformanceRating'] - 1)
 
-                        return df
+    return df
 
 def validate_data_consistency(df):
     """Validate and ensure logical consistency between related fields"""
@@ -639,14 +634,14 @@ def validate_data_consistency(df):
 
     return df
 
-def generate_hr_dataset(n=TOTAL_EMPLOYEES):
+def generate_hr_dataset(n=TOTAL_EMPLOYEES, id_offset=0, max_span=DEFAULT_MAX_SPAN):
     """Generate the complete HR dataset with all required features"""
     
     print(f"Generating synthetic HR dataset for {n} employees...")
     
     # Generate base demographic data
     print("Generating employee demographics...")
-    df = generate_employee_base(n)
+    df = generate_employee_base(n, id_offset=id_offset)
     
     # Generate employment history including attrition
     print("Generating employment history...")
@@ -676,6 +671,10 @@ def generate_hr_dataset(n=TOTAL_EMPLOYEES):
     print("Validating data consistency...")
     df = validate_data_consistency(df)
     
+    # Assign managers and build the reporting tree
+    print("Generating organizational hierarchy...")
+    df = add_org_structure(df, max_span=max_span)
+    
     # Format date columns as strings
     df['HireDate'] = df['HireDate'].dt.strftime('%Y-%m-%d')
     df['TerminationDate'] = df['TerminationDate'].apply(
@@ -0,0 +1,19 @@
+# Departure reasons by turnover category, kept free of import side effects so analysis
+# modules can use them without reseeding the generator
+VOLUNTARY_REASONS = [
+    'Better Opportunity', 
+    'Work-Life Balance', 
+    'Career Growth', 
+    'Relocation', 
+    'Education', 
+    'Personal Reasons',
+    'Retirement'
+]
+
+INVOLUNTARY_REASONS = [
+    'Performance Issue', 
+    'Reorganization', 
+    'Contract End', 
+    'Policy Violation',
+    'Misconduct'
+]
@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+
+# Event types, in the order of their categorical codes
+EVENT_TYPES = ['Promotion', 'SalaryChange', 'ManagerChange']
+PROMOTION, SALARY_CHANGE, MANAGER_CHANGE = range(len(EVENT_TYPES))
+
+# Employees processed per chunk when streaming the event log
+DEFAULT_EVENT_CHUNK_SIZE = 100000
+
+# JobLevel runs from 1 to 6, so an employee has at most 5 promotions
+MAX_PROMOTIONS = 5
+
+# Stop of the interval of employees with zero tenure, who left or were observed within
+# their first month; (0, 0] intervals are rejected by time-varying Cox fitters
+ZERO_TENURE_STOP = 0.5
+
+def employee_index(ids):
+    """Zero-based integer index parsed from EmployeeIDs ("EMP00001" -> 0)"""
+    return pd.Series(ids).str.slice(3).astype(np.int64).to_numpy() - 1
+
+def _expand(counts):
+    """Owner position and rank within the owner for a ragged array with the given group sizes"""
+    owner = np.repeat(np.arange(len(counts)), counts)
+    rank = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, rank
+
+def _last_per_month(row, month):
+    """Mask keeping the last of each run of equal (row, month) pairs in sorted arrays"""
+    keep = np.ones(row.size, dtype=bool)
+    keep[:-1] = (row[1:] != row[:-1]) | (month[1:] != month[:-1])
+    return keep
+
+def _salary_step(df):
+    """Relative size of each salary change, taken from last year's hike (at least 1%)"""
+    return np.maximum(df['PercentSalaryHikeLastYear'].to_numpy(dtype=np.float64), 1.0) / 100
+
+def _months_before_end(tenure, years, uniform):
+    """
+    Months from an event to the end of tenure that floor to `years` whole years and keep
+    the event strictly inside (0, Tenure), picked with one uniform draw per employee.
+    Returns the months and whether any fits.
+    """
+    low = np.where(years == 0, 1, 12 * years)
+    high = np.minimum(12 * years + 11, tenure - 1)
+    fits = high >= low
+    months = low + (uniform * np.maximum(high - low + 1, 1)).astype(np.int64)
+    return months, fits
+
+def generate_events(df):
+    """
+    Generate the promotion, salary change and manager change events behind the snapshot fields.
+
+    Returns a columnar event table (EmployeeIndex, Month, EventType, NewValue) sorted by
+    employee and month, where Month is the tenure month of the event. Events fall in
+    (0, Tenure] and agree with the snapshot columns:
+    - NumberOfPromotions promotions, the last one YearsSinceLastPromotion years before
+      the end of tenure; NewValue is the JobLevel after the promotion, ending at JobLevel
+    - annual salary reviews and promotion raises, the last one exactly
+      MonthsSinceLastSalaryChange months before the end of tenure (at Tenure itself when
+      that is 0); NewValue is the MonthlyIncome after the change, ending at MonthlyIncome
+    - a manager change YearsWithCurrentManager years before the end of tenure (none if the
+      employee has had the same manager since hire), preceded by one at each earlier
+      promotion; NewValue is the EmployeeIndex of the new manager when known (ManagerID
+      for the current manager), NaN otherwise
+
+    Promotions and manager changes fall strictly before Tenure. The snapshot cannot be
+    matched in two cases: employees with Tenure below 2 get no promotions, and when
+    YearsSinceLastPromotion * 12 equals Tenure (a promotion at hire) the last promotion
+    is placed in month 1.
+    """
+    n = len(df)
+    tenure = df['Tenure'].to_numpy(dtype=np.int64)
+    eligible = tenure >= 2  # need at least one month strictly inside (0, Tenure)
+    job_level = df['JobLevel'].to_numpy(dtype=np.int64)
+    income = df['MonthlyIncome'].to_numpy(dtype=np.float64)
+
+    # A fixed-width row of uniforms per employee (last promotion, manager change, earlier
+    # promotions), so a chunk draws exactly what its rows would draw within the whole frame
+    n_promotions = np.where(eligible, df['NumberOfPromotions'].to_numpy(dtype=np.int64), 0)
+    if (n_promotions > MAX_PROMOTIONS).any():
+        raise ValueError(f"NumberOfPromotions above {MAX_PROMOTIONS}")
+    uniform = np.random.random((n, 2 + MAX_PROMOTIONS))
+
+    # Promotions: the last one matches YearsSinceLastPromotion, earlier ones are spread before it
+    since_promotion, fits = _months_before_end(
+        tenure, df['YearsSinceLastPromotion'].to_numpy(dtype=np.int64), uniform[:, 0]
+    )
+    last_promotion = np.where(fits, tenure - since_promotion, 1)
+    promo_row, promo_rank = _expand(n_promotions)
+    earlier = 1 + (uniform[promo_row, 2 + promo_rank] * np.maximum(last_promotion[promo_row] - 1, 1)).astype(np.int64)
+    promo_month = np.where(promo_rank == n_promotions[promo_row] - 1, last_promotion[promo_row], earlier)
+    promo_month = promo_month[np.lexsort((promo_month, promo_row))]
+    promo_value = (job_level - n_promotions)[promo_row] + promo_rank + 1
+
+    # Salary changes: annual reviews and promotion raises, the last one matching MonthsSinceLastSalaryChange
+    since_salary = df['MonthsSinceLastSalaryChange'].to_numpy(dtype=np.int64)
+    has_salary = since_salary < tenure
+    last_salary = tenure - since_salary
+    n_reviews = np.where(has_salary, (last_salary - 1) // 12, 0)
+    review_row, review_rank = _expand(n_reviews)
+    raise_mask = has_salary[promo_row] & (promo_month < last_salary[promo_row])
+    last_row = np.flatnonzero(has_salary)
+    salary_row = np.concatenate([review_row, promo_row[raise_mask], last_row])
+    salary_month = np.concatenate([12 * (review_rank + 1), promo_month[raise_mask], last_salary[last_row]])
+    order = np.lexsort((salary_month, salary_row))
+    salary_row, salary_month = salary_row[order], salary_month[order]
+    keep = _last_per_month(salary_row, salary_month)
+    salary_row, salary_month = salary_row[keep], salary_month[keep]
+    n_salary = np.bincount(salary_row, minlength=n)
+    _, salary_rank = _expand(n_salary)
+    steps_to_go = n_salary[salary_row] - 1 - salary_rank
+    salary_value = income[salary_row] / (1 + _salary_step(df)[salary_row]) ** steps_to_go
+
+    # Manager changes: the last one matches YearsWithCurrentManager, earlier ones follow promotions
+    since_manager, has_manager_change = _months_before_end(
+        tenure, df['YearsWithCurrentManager'].to_numpy(dtype=np.int64), uniform[:, 1]
+    )
+    last_manager = tenure - since_manager
+    current_manager = np.full(n, np.nan)
+    if 'ManagerID' in df.columns:
+        known = df['ManagerID'].notna().to_numpy()
+        current_manager[known] = employee_index(df['ManagerID'].to_numpy()[known])
+    follow_mask = has_manager_change[promo_row] & (promo_month < last_manager[promo_row])
+    change_row = np.flatnonzero(has_manager_change)
+    manager_row = np.concatenate([promo_row[follow_mask], change_row])
+    manager_month = np.concatenate([promo_month[follow_mask], last_manager[change_row]])
+    manager_value = np.concatenate([np.full(follow_mask.sum(), np.nan), current_manager[change_row]])
+    # At most one manager change per month, preferring the one with a known manager
+    order = np.lexsort((~np.isnan(manager_value), manager_month, manager_row))
+    manager_row, manager_month, manager_value = manager_row[order], manager_month[order], manager_value[order]
+    keep = _last_per_month(manager_row, manager_month)
+    manager_row, manager_month, manager_value = manager_row[keep], manager_month[keep], manager_value[keep]
+
+    row = np.concatenate([promo_row, salary_row, manager_row])
+    month = np.concatenate([promo_month, salary_month, manager_month])
+    code = np.concatenate([
+        np.full(promo_row.size, PROMOTION, dtype=np.int8),
+        np.full(salary_row.size, SALARY_CHANGE, dtype=np.int8),
+        np.full(manager_row.size, MANAGER_CHANGE, dtype=np.int8),
+    ])
+    value = np.concatenate([promo_value.astype(np.float64), salary_value, manager_value])
+    order = np.lexsort((code, month, row))
+
+    return pd.DataFrame({
+        'EmployeeIndex': employee_index(df['EmployeeID'].to_numpy())[row[order]],
+        'Month': month[order].astype(np.int32),
+        'EventType': pd.Categorical.from_codes(code[order], categories=EVENT_TYPES),
+        'NewValue': value[order],
+    })
+
+def to_counting_process(df, events, static_columns=()):
+    """
+    Convert employees and their events into counting-process (Start, Stop] intervals.
+
+    Every distinct event month opens a new interval, so each employee contributes one
+    row per change of state plus one. Event is 1 only on the last interval of employees
+    who left. Time-varying covariates hold the state at the start of the interval:
+    JobLevel and MonthlyIncome (forward-filled from the event values) and the running
+    PromotionsToDate and ManagerChangesToDate counts. Columns named in `static_columns`
+    are copied from `df`. Employees with zero tenure get a single (0, ZERO_TENURE_STOP]
+    interval, so every interval has positive length.
+    """
+    n = len(df)
+    row = pd.Index(employee_index(df['EmployeeID'].to_numpy())).get_indexer(events['EmployeeIndex'].to_numpy())
+    if (row < 0).any():
+        raise ValueError("events refer to employees that are not in df")
+
+    month = events['Month'].to_numpy(dtype=np.int64)
+    code = events['EventType'].cat.codes.to_numpy()
+    value = events['NewValue'].to_numpy(dtype=np.float64)
+    order = np.lexsort((code, month, row))
+    row, month, code, value = row[order], month[order], code[order], value[order]
+
+    # Starting states count every event; events at the end of tenure change nothing after it
+    is_promotion = code == PROMOTION
+    is_salary = code == SALARY_CHANGE
+    promotions = np.bincount(row[is_promotion], minlength=n)
+    salary_changes = np.bincount(row[is_salary], minlength=n)
+    tenure = df['Tenure'].to_numpy(dtype=np.int64)
+    inside = month < tenure[row]
+    row, month, code, value = row[inside], month[inside], code[inside], value[inside]
+
+    # Each distinct (employee, month) is a split point that starts a new interval
+    new_split = np.ones(row.size, dtype=bool)
+    new_split[1:] = (row[1:] != row[:-1]) | (month[1:] != month[:-1])
+    split_row, split_month = row[new_split], month[new_split]
+    n_splits = np.bincount(split_row, minlength=n)
+    split_rank = np.arange(split_row.size) - (np.cumsum(n_splits) - n_splits)[split_row]
+
+    counts = n_splits + 1
+    owner, _ = _expand(counts)
+    first = np.cumsum(counts) - counts
+    last = first + counts - 1
+    split_interval = first[split_row] + split_rank + 1
+    event_interval = split_interval[np.cumsum(new_split) - 1]
+    m = owner.size
+
+    start = np.zeros(m, dtype=np.int64)
+    start[split_interval] = split_month
+    stop = tenure[owner].astype(np.float64)
+    stop[stop == 0] = ZERO_TENURE_STOP
+    stop[split_interval - 1] = split_month
+    attrited = (df['AttritionFlag'] == 'Yes').to_numpy()
+    event = np.zeros(m, dtype=np.int8)
+    event[last] = attrited
+
+    def running_count(mask):
+        total = np.cumsum(np.bincount(event_interval[mask], minlength=m))
+        return total - total[first][owner]
+
+    def forward_fill(mask, initial):
+        filled = np.empty(m)
+        is_set = np.zeros(m, dtype=bool)
+        filled[first], is_set[first] = initial, True
+        filled[event_interval[mask]], is_set[event_interval[mask]] = value[mask], True
+        return filled[np.maximum.accumulate(np.where(is_set, np.arange(m), 0))]
+
+    is_promotion = code == PROMOTION
+    is_salary = code == SALARY_CHANGE
+    initial_level = df['JobLevel'].to_numpy(dtype=np.int64) - promotions
+    initial_income = (df['MonthlyIncome'].to_numpy(dtype=np.float64)
+                      / (1 + _salary_step(df)) ** salary_changes)
+
+    intervals = pd.DataFrame({
+        'EmployeeIndex': employee_index(df['EmployeeID'].to_numpy())[owner],
+        'Start': start.astype(np.int32),
+        'Stop': stop.astype(np.float32),
+        'Event': event,
+        'JobLevel': forward_fill(is_promotion, initial_level).astype(np.int8),
+        'MonthlyIncome': forward_fill(is_salary, initial_income),
+        'PromotionsToDate': running_count(is_promotion).astype(np.int16),
+        'ManagerChangesToDate': running_count(code == MANAGER_CHANGE).astype(np.int16),
+    })
+    for col in static_columns:
+        intervals[col] = df[col].to_numpy()[owner]
+
+    return intervals
+
+def iter_event_log(df, chunk_size=DEFAULT_EVENT_CHUNK_SIZE, static_columns=()):
+    """
+    Yield (events, intervals) for consecutive chunks of employees, so neither table is held
+    in full. Concatenated, the chunks equal the whole-frame tables from the same random state.
+    """
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        events = generate_events(chunk)
+        yield events, to_counting_process(chunk, events, static_columns)
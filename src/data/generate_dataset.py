@@ -1,13 +1,31 @@
+"""
+Command-line entry point for the synthetic HR dataset.
+
+    python -m src.data.generate_dataset generate [--n N] [--seed S] [--workers W] ...
+    python -m src.data.generate_dataset stats [--input PATH]
+    python -m src.data.generate_dataset estimate-cost --n 1000000
+
+Settings come from the data_generation section of params.yaml; command-line options
+override them for one run without touching the file. pandas, numpy and the generator
+are imported inside the subcommands, so --help does not pay for them.
+"""
+import argparse
 import os
-import yaml
 import sys
-from pathlib import Path
+import time
 from datetime import datetime
 
-# Add the project root to the Python path
-sys.path.append(str(Path(__file__).parent.parent.parent))
+# Standard library only, cheap enough for --help
+from src.data.writer import COMPRESSION_SUFFIXES, COMPRESSIONS, FORMATS
 
-from src.data.data_generator import generate_hr_dataset
+# Optional outputs streamed alongside the dataset
+SIDE_OUTPUTS = ('events_file', 'intervals_file')
+
+# Columns the statistics report reads
+STATS_COLUMNS = ['Tenure', 'EmploymentStatus', 'AttritionFlag', 'Department', 'TurnoverCategory', 'DepartureReason']
+
+# Rows generated by estimate-cost to calibrate its predictions
+DEFAULT_CALIBRATION_SIZE = 400
 
 def generate_statistics_report(df):
     """Generate a Markdown report with summary statistics for the dataset"""
@@ -75,38 +93,326 @@ Generated: {now}
     
     return markdown
 
-def main():
-    # Load parameters
-    with open("params.yaml", "r") as params_file:
-        params = yaml.safe_load(params_file)
-    
-    data_params = params["data_generation"]
-    
-    # Create output directories if they don't exist
-    output_dir = data_params["output_dir"]
-    report_dir = "reports/data_generation"
-    os.makedirs(output_dir, exist_ok=True)
-    os.makedirs(report_dir, exist_ok=True)
-    
-    # Generate the dataset
-    sample_size = data_params["sample_size"]
-    hr_data = generate_hr_dataset(sample_size)
-    
-    # Print summary to console (for logs)
+def summarize_chunk(df):
+    """Keep only the columns the statistics report needs, as compact categoricals"""
+    import pandas as pd
+    from src.data.data_generator import DEPT_ATTRITION_RATES, INVOLUNTARY_REASONS, VOLUNTARY_REASONS
+
+    categories = {
+        'EmploymentStatus': ['Current', 'Former'],
+        'AttritionFlag': ['Yes', 'No'],
+        'Department': list(DEPT_ATTRITION_RATES.keys()),
+        'TurnoverCategory': ['Voluntary', 'Involuntary'],
+        'DepartureReason': VOLUNTARY_REASONS + INVOLUNTARY_REASONS,
+    }
+    summary = pd.DataFrame({'Tenure': df['Tenure'].to_numpy()})
+    for col, col_categories in categories.items():
+        summary[col] = pd.Categorical(df[col], categories=col_categories)
+    return summary
+
+def load_settings(args):
+    """data_generation parameters from the params file, with command-line overrides applied"""
+    import yaml
+
+    with open(args.params, "r") as params_file:
+        settings = dict(yaml.safe_load(params_file)["data_generation"])
+
+    # The configured file names are the DVC stage's outs, so they must already carry the
+    # configured compression's suffix; a --compression override gets it from output_path
+    configured = settings.get('compression', 'none')
+    if configured not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression '{configured}' in {args.params}, expected one of {COMPRESSIONS}")
+    for key in ('output_file', *SIDE_OUTPUTS):
+        if settings.get(key) and not settings[key].endswith(COMPRESSION_SUFFIXES[configured]):
+            raise ValueError(f"{key} in {args.params} must end with "
+                             f"'{COMPRESSION_SUFFIXES[configured]}' for {configured} compression")
+
+    overrides = {
+        'sample_size': args.n,
+        'random_seed': args.seed,
+        'chunk_size': args.chunk_size,
+        'workers': args.workers,
+        'compression': args.compression,
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+
+    # The format is a command-line option only: parquet renames the outputs, which the
+    # DVC stage's outs (the configured file names) would no longer match
+    settings['format'] = args.format or 'csv'
+    settings.setdefault('chunk_size', settings['sample_size'])
+    settings.setdefault('workers', 1)
+    settings.setdefault('compression', 'none')
+    settings.setdefault('writer_queue_size', 2)
+    settings.setdefault('report_dir', 'reports/data_generation')
+    if settings['sample_size'] < 1 or settings['chunk_size'] < 1 or settings['workers'] < 1:
+        raise ValueError("n, chunk size and workers must be positive")
+    return settings
+
+def output_path(settings, key='output_file'):
+    """
+    Path of one output file. With the parquet format its extension becomes .parquet;
+    compressed CSV gets the compression's suffix (.gz, .zst) if the name lacks it.
+    """
+    name = settings[key]
+    suffix = COMPRESSION_SUFFIXES[settings['compression']]
+    if settings['format'] == 'parquet':
+        name = name.split('.')[0] + '.parquet'
+    elif not name.endswith(suffix):
+        name += suffix
+    return os.path.join(settings['output_dir'], name)
+
+def _generate_chunk(chunk_index, start, size, random_seed, max_span, side_keys):
+    """Generate one independently seeded chunk and its side outputs"""
+    from src.data.data_generator import generate_hr_dataset, seed_generators
+    from src.data.event_log import generate_events, to_counting_process
+
+    seed_generators(random_seed, chunk_index)
+    chunk = generate_hr_dataset(size, id_offset=start, max_span=max_span)
+    side = {}
+    if side_keys:
+        events = generate_events(chunk)
+        if 'events_file' in side_keys:
+            side['events_file'] = events
+        if 'intervals_file' in side_keys:
+            side['intervals_file'] = to_counting_process(chunk, events)
+    return chunk, side
+
+def iter_chunks(settings, side_keys=()):
+    """
+    Yield (chunk, side outputs) in order. Each chunk is seeded from (seed, index), so with
+    workers > 1 chunks are generated in a process pool and the output is the same as
+    with one worker. At most `workers` chunks beyond the one being consumed are in flight.
+    """
+    from src.data.org_structure import DEFAULT_MAX_SPAN
+
+    sample_size, chunk_size = settings['sample_size'], settings['chunk_size']
+    tasks = [
+        (chunk_index, start, min(chunk_size, sample_size - start), settings['random_seed'],
+         settings.get('max_span_of_control', DEFAULT_MAX_SPAN), tuple(side_keys))
+        for chunk_index, start in enumerate(range(0, sample_size, chunk_size))
+    ]
+    workers = min(settings['workers'], len(tasks))
+    if workers == 1:
+        for task in tasks:
+            yield _generate_chunk(*task)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_generate_chunk, *task))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_report(summary, report_dir):
+    """Print the statistics and save the Markdown report; returns the report path"""
     from src.data.data_generator import print_dataset_stats
-    print_dataset_stats(hr_data)
-    
-    # Save to CSV
-    output_path = os.path.join(output_dir, data_params["output_file"])
-    hr_data.to_csv(output_path, index=False)
-    print(f"\nDataset saved to {output_path}")
-    
-    # Create and save the Markdown report
-    report = generate_statistics_report(hr_data)
+
+    os.makedirs(report_dir, exist_ok=True)
+    print_dataset_stats(summary)
     report_path = os.path.join(report_dir, "dataset_statistics.md")
     with open(report_path, "w") as f:
-        f.write(report)
+        f.write(generate_statistics_report(summary))
+    return report_path
+
+def generate(settings):
+    """Generate the dataset (and side outputs), streaming chunks to background writers"""
+    from contextlib import ExitStack
+
+    import pandas as pd
+    from src.data.writer import BackgroundWriter
+
+    os.makedirs(settings['output_dir'], exist_ok=True)
+    writer_options = {
+        'compression': settings['compression'],
+        'max_queue': settings['writer_queue_size'],
+        'file_format': settings['format'],
+    }
+    side_keys = [key for key in SIDE_OUTPUTS if settings.get(key)]
+
+    # Generate chunk k+1 while the background writers serialize chunk k
+    summaries = []
+    with ExitStack() as stack:
+        writer = stack.enter_context(BackgroundWriter(output_path(settings), **writer_options))
+        side_writers = {
+            key: stack.enter_context(BackgroundWriter(output_path(settings, key), **writer_options))
+            for key in side_keys
+        }
+        for chunk, side in iter_chunks(settings, side_keys):
+            writer.write(chunk)
+            for key, frame in side.items():
+                side_writers[key].write(frame)
+            summaries.append(summarize_chunk(chunk))
+
+    print(f"\nDataset saved to {writer.path} ({writer.rows_written} rows, "
+          f"format: {settings['format']}, compression: {settings['compression']})")
+    for key, side_writer in side_writers.items():
+        print(f"{key} saved to {side_writer.path} ({side_writer.rows_written} rows)")
+
+    report_path = write_report(pd.concat(summaries, ignore_index=True), settings['report_dir'])
     print(f"Statistics report generated at {report_path}")
 
+def stats(settings, input_path=None):
+    """Rebuild the statistics report from an existing dataset file, reading it in chunks"""
+    import pandas as pd
+    from src.data.reader import iter_input
+
+    input_path = input_path or output_path(settings)
+    summaries = [summarize_chunk(chunk) for chunk in iter_input(input_path, STATS_COLUMNS, settings['chunk_size'])]
+
+    report_path = write_report(pd.concat(summaries, ignore_index=True), settings['report_dir'])
+    print(f"Statistics report for {input_path} generated at {report_path}")
+
+def _serialized_size(df, file_format, compression):
+    """Bytes one frame takes in the output file, serialized in memory"""
+    import io
+
+    if file_format == 'parquet':
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False, compression=compression)
+        return buffer.tell()
+
+    data = df.to_csv(index=False).encode('utf-8')
+    if compression == 'gzip':
+        import gzip
+        data = gzip.compress(data, compresslevel=6)
+    elif compression == 'zstd':
+        from src.data.writer import import_zstandard
+        data = import_zstandard().ZstdCompressor(level=3).compress(data)
+    return len(data)
+
+def _calibrate(settings, size, side_keys, trace_memory=False):
+    """
+    Generation seconds, serialization seconds, output bytes, in-memory bytes of the
+    finished frames, bytes of the report summary and (with trace_memory) the peak bytes
+    allocated while generating one chunk. Tracing slows generation down, so traced runs
+    are not used for timing.
+    """
+    import contextlib
+    import io
+    import tracemalloc
+
+    from src.data.org_structure import DEFAULT_MAX_SPAN
+
+    max_span = settings.get('max_span_of_control', DEFAULT_MAX_SPAN)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        chunk, side = _generate_chunk(0, 0, size, settings['random_seed'], max_span, side_keys)
+    generate_seconds = time.perf_counter() - start
+    peak_bytes = 0
+    if trace_memory:
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    frames = [chunk, *side.values()]
+    start = time.perf_counter()
+    output_bytes = sum(_serialized_size(frame, settings['format'], settings['compression']) for frame in frames)
+    write_seconds = time.perf_counter() - start
+
+    frame_bytes = sum(frame.memory_usage(deep=True).sum() for frame in frames)
+    summary_bytes = summarize_chunk(chunk).memory_usage(deep=True).sum()
+    return generate_seconds, write_seconds, output_bytes, frame_bytes, summary_bytes, peak_bytes
+
+def estimate_cost(settings, calibration_size=DEFAULT_CALIBRATION_SIZE):
+    """
+    Predict runtime, peak memory and output size of `generate` without writing anything.
+    Memory covers the generated data, not the interpreter and libraries of each process.
+
+    A first, untimed half-size chunk measures the working memory. Two timed chunks (half
+    and full calibration size) then separate the fixed per-chunk cost from the per-row
+    cost; both are scaled to the configured sample size, chunk size and number of workers. Serialization runs on the writer threads in parallel with
+    generation, so the predicted runtime is the slower of the two.
+    """
+    import math
+
+    side_keys = tuple(key for key in SIDE_OUTPUTS if settings.get(key))
+    rows_small = max(calibration_size // 2, 1)
+    # The first run pays the import and first-call costs, so it is not timed; it measures
+    # the working memory instead, which is when tracing slowing it down does not matter
+    traced = _calibrate(settings, rows_small, side_keys, trace_memory=True)
+    small = _calibrate(settings, rows_small, side_keys)
+    large = _calibrate(settings, calibration_size, side_keys)
+
+    extra_rows = max(calibration_size - rows_small, 1)
+    per_row = [max((b - a) / extra_rows, 0.0) for a, b in zip(small[:2], large[:2])]
+    fixed = [max(a - rate * rows_small, 0.0) for a, rate in zip(small[:2], per_row)]
+    output_per_row, frame_per_row, summary_per_row = (value / calibration_size for value in large[2:5])
+    working_per_row = traced[5] / rows_small
+
+    n = settings['sample_size']
+    chunk_rows = min(settings['chunk_size'], n)
+    n_chunks = math.ceil(n / chunk_rows)
+    workers = min(settings['workers'], n_chunks)
+    # Workers beyond the number of CPUs add no throughput
+    parallelism = min(workers, os.cpu_count() or 1)
+
+    generate_seconds = (n_chunks * fixed[0] + n * per_row[0]) / parallelism
+    write_seconds = n_chunks * fixed[1] + n * per_row[1]
+    runtime = max(generate_seconds, write_seconds) + fixed[1] + chunk_rows * per_row[1]
+
+    # One chunk being generated per worker; finished chunks held by iter_chunks (up to one
+    # per worker with a pool), waiting in the writer queues or being written; and the
+    # report summary kept for every row
+    chunks_waiting = settings['writer_queue_size'] + 1 + (workers if workers > 1 else 0)
+    peak_memory = (workers * working_per_row + chunks_waiting * frame_per_row) * chunk_rows + n * summary_per_row
+
+    print(f"Estimated cost of generating {n} employees "
+          f"({n_chunks} chunks of {chunk_rows}, {workers} workers on {os.cpu_count()} CPUs, "
+          f"{settings['format']}/{settings['compression']}):")
+    print(f"  Runtime: {runtime:.1f} s (generation {generate_seconds:.1f} s, writing {write_seconds:.1f} s)")
+    print(f"  Peak memory: {peak_memory / 2**20:.0f} MiB")
+    print(f"  Output size: {n * output_per_row / 2**20:.0f} MiB")
+    print(f"  Calibrated on {calibration_size} rows: "
+          f"{per_row[0] * 1e3:.3f} ms/row generation, {per_row[1] * 1e3:.3f} ms/row writing")
+
+    return {'runtime_seconds': runtime, 'peak_memory_bytes': peak_memory, 'output_bytes': n * output_per_row}
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.data.generate_dataset",
+        description="Generate the synthetic BFI Finance HR dataset.",
+    )
+    parser.add_argument("--params", default="params.yaml", help="parameters file (default: params.yaml)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Overrides shared by every subcommand; None keeps the value from the params file
+    overrides = argparse.ArgumentParser(add_help=False)
+    overrides.add_argument("--n", type=int, help="number of employees (sample_size)")
+    overrides.add_argument("--seed", type=int, help="random seed (random_seed)")
+    overrides.add_argument("--chunk-size", type=int, help="employees per chunk (chunk_size)")
+    overrides.add_argument("--workers", type=int, help="processes generating chunks (workers)")
+    overrides.add_argument("--format", choices=FORMATS, help="output format (default: csv); parquet outputs use the .parquet extension")
+    overrides.add_argument("--compression", choices=COMPRESSIONS, help="output compression (compression)")
+
+    subparsers.add_parser("generate", parents=[overrides], help="generate the dataset and statistics report")
+    stats_parser = subparsers.add_parser("stats", parents=[overrides], help="rebuild the statistics report from an existing dataset")
+    stats_parser.add_argument("--input", help="dataset file (default: the configured output file)")
+    cost_parser = subparsers.add_parser("estimate-cost", parents=[overrides], help="predict runtime and memory without writing anything")
+    cost_parser.add_argument("--calibration-size", type=int, default=DEFAULT_CALIBRATION_SIZE,
+                             help=f"employees generated to calibrate the estimate (default: {DEFAULT_CALIBRATION_SIZE})")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        settings = load_settings(args)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.command == "generate":
+        generate(settings)
+    elif args.command == "stats":
+        stats(settings, args.input)
+    elif args.command == "estimate-cost":
+        estimate_cost(settings, args.calibration_size)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+
+# Default maximum number of direct reports per manager
+DEFAULT_MAX_SPAN = 12
+
+# Manager search scopes, narrowest first: a manager in the same branch is preferred,
+# then one in the same department and region, then anyone in the department
+SCOPES = [
+    ['Department', 'Region', 'BranchType'],
+    ['Department', 'Region'],
+    ['Department'],
+]
+
+def _assign_pass(group, n_groups, levels, parent, load, max_span, is_report):
+    """
+    Assign managers to as many unassigned reports (is_report) as possible within one scope.
+
+    Each employee reports to the next higher job level that still has spare
+    capacity in their scope group, and the reports of a (group, level) bucket are
+    spread round-robin over that bucket's managers. Works on flat arrays only, so
+    one pass is linear in the number of employees. Returns the number of employees
+    that received a manager.
+    """
+    n = len(levels)
+    width = levels.max() + 2  # level columns 0..max_level+1, the last one always empty
+
+    # Levels with spare manager capacity in each group
+    has_room = load < max_span
+    present = np.zeros((n_groups, width), dtype=bool)
+    present[group[has_room], levels[has_room]] = True
+
+    # next_level[g, l]: smallest level above l with spare capacity in group g (0 if none)
+    next_level = np.zeros((n_groups, width), dtype=np.int64)
+    for level in range(width - 2, 0, -1):
+        next_level[:, level] = np.where(present[:, level + 1], level + 1, next_level[:, level + 1])
+
+    reports = np.flatnonzero((parent < 0) & is_report)
+    target = next_level[group[reports], levels[reports]]
+    reports, target = reports[target > 0], target[target > 0]
+    if reports.size == 0:
+        return 0
+
+    n_buckets = n_groups * width
+    report_bucket = group[reports] * width + target
+    demand = np.bincount(report_bucket, minlength=n_buckets)
+
+    managers = np.flatnonzero(has_room)
+    manager_bucket = group[managers] * width + levels[managers]
+    wanted = demand[manager_bucket] > 0
+    managers, manager_bucket = managers[wanted], manager_bucket[wanted]
+    supply = np.bincount(manager_bucket, minlength=n_buckets)
+
+    # Each manager offers an even share of the bucket's demand, capped by their spare room,
+    # so the number of slots stays linear in the number of employees
+    share = -(-demand[manager_bucket] // supply[manager_bucket])
+    slots = np.minimum(share, max_span - load[managers])
+    slot_manager = np.repeat(managers, slots)
+    slot_bucket = np.repeat(manager_bucket, slots)
+    slot_rank = np.arange(slot_manager.size) - np.repeat(np.cumsum(slots) - slots, slots)
+
+    # Order slots by bucket, then rank, then manager: round-robin over the bucket's managers
+    slot_order = np.lexsort((slot_manager, slot_rank, slot_bucket))
+    slot_manager = slot_manager[slot_order]
+    slot_count = np.bincount(slot_bucket, minlength=n_buckets)
+    slot_start = np.cumsum(slot_count) - slot_count
+
+    report_order = np.argsort(report_bucket, kind='stable')
+    reports, report_bucket = reports[report_order], report_bucket[report_order]
+    rank = np.arange(reports.size) - (np.cumsum(demand) - demand)[report_bucket]
+
+    placed = rank < slot_count[report_bucket]
+    chosen = slot_manager[slot_start[report_bucket[placed]] + rank[placed]]
+    parent[reports[placed]] = chosen
+    load += np.bincount(chosen, minlength=n)
+
+    return int(placed.sum())
+
+def employment_snapshots(df):
+    """
+    Pairs of (reports, candidate managers) row positions whose employment overlaps.
+
+    Current employees report to current employees. Leavers are grouped by the month
+    of their TerminationDate and report to someone employed for that whole month
+    (hired on or before its first day and not gone before the next month starts).
+    """
+    hire = pd.to_datetime(df['HireDate']).to_numpy()
+    termination = pd.to_datetime(df['TerminationDate']).to_numpy()
+    is_current = np.isnat(termination)
+
+    current = np.flatnonzero(is_current)
+    snapshots = [(current, current)]
+
+    leavers = np.flatnonzero(~is_current)
+    month = termination[leavers].astype('datetime64[M]')
+    order = np.argsort(month, kind='stable')
+    months, starts = np.unique(month[order], return_index=True)
+    for m, reports in zip(months, np.split(leavers[order], starts[1:])):
+        month_start = m.astype(hire.dtype)
+        next_month = (m + 1).astype(hire.dtype)
+        employed = (hire <= month_start) & (is_current | (termination >= next_month))
+        snapshots.append((reports, np.flatnonzero(employed)))
+
+    return snapshots
+
+def _assign_snapshot(groups, levels, reports, candidates, max_span):
+    """Manager row positions for `reports` chosen among `candidates` (-1 where none fits)"""
+    is_report = np.zeros(len(levels), dtype=bool)
+    is_report[reports] = True
+    is_candidate = np.zeros(len(levels), dtype=bool)
+    is_candidate[candidates] = True
+    rows = np.flatnonzero(is_report | is_candidate)
+    is_report = is_report[rows]
+    # Rows that are not candidates have no room, so they are never picked as managers
+    load = np.where(is_candidate[rows], 0, max_span)
+
+    parent = np.full(rows.size, -1, dtype=np.int64)
+    levels = levels[rows]
+    for group, n_groups in groups:
+        group = group[rows]
+        # Repeat until the scope is saturated; leftovers escalate to the next scope
+        while _assign_pass(group, n_groups, levels, parent, load, max_span, is_report):
+            pass
+
+    # reports are sorted, so they come out of rows in the same order
+    chosen = parent[is_report]
+    return np.where(chosen >= 0, rows[np.maximum(chosen, 0)], -1)
+
+def assign_managers(df, max_span=DEFAULT_MAX_SPAN):
+    """
+    Build the reporting tree as a parent-index array.
+
+    parent[i] is the row position of employee i's manager, or -1 for the top of a
+    department. Managers always hold a higher JobLevel than their reports, come from
+    the same Department (preferring the same Region and BranchType, see SCOPES), were
+    employed at the same time as their reports (see employment_snapshots) and have at
+    most `max_span` direct reports within each snapshot.
+    """
+    if max_span < 1:
+        raise ValueError("max_span must be at least 1")
+
+    n = len(df)
+    parent = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return parent
+
+    levels = df['JobLevel'].to_numpy(dtype=np.int64)
+    groups = []
+    for scope in SCOPES:
+        group = df.groupby(scope, sort=False).ngroup().to_numpy(dtype=np.int64)
+        groups.append((group, int(group.max()) + 1))
+
+    for reports, candidates in employment_snapshots(df):
+        if reports.size:
+            parent[reports] = _assign_snapshot(groups, levels, reports, candidates, max_span)
+
+    return parent
+
+def add_org_structure(df, max_span=DEFAULT_MAX_SPAN):
+    """Add a ManagerID column holding the EmployeeID of each employee's manager"""
+
+    # Create a copy to avoid modifying the original
+    df = df.copy()
+
+    parent = assign_managers(df, max_span)
+    employee_ids = df['EmployeeID'].to_numpy(dtype=object)
+    manager_ids = np.full(len(df), None, dtype=object)
+    has_manager = parent >= 0
+    manager_ids[has_manager] = employee_ids[parent[has_manager]]
+    df['ManagerID'] = manager_ids
+
+    return df
+
+def team_size(parent):
+    """Number of direct reports of every employee"""
+    has_manager = parent >= 0
+    return np.bincount(parent[has_manager], minlength=len(parent))
+
+def node_depth(parent):
+    """
+    Number of managers above every employee (0 at the top of a department).
+
+    Walks all nodes up one level per iteration; since every manager holds a higher
+    JobLevel than their reports, the number of iterations is bounded by the number
+    of job levels and the walk stays linear.
+    """
+    depth = np.zeros(len(parent), dtype=np.int64)
+    node = np.flatnonzero(parent >= 0)
+    ancestor = parent[node]
+    while node.size:
+        depth[node] += 1
+        ancestor = parent[ancestor]
+        still_climbing = ancestor >= 0
+        node, ancestor = node[still_climbing], ancestor[still_climbing]
+    return depth
+
+def subtree_sum(parent, values, depth=None):
+    """Sum of `values` over every employee's subtree (the employee included)"""
+    totals = np.asarray(values, dtype=np.float64).copy()
+    if depth is None:
+        depth = node_depth(parent)
+
+    # Push totals up one level at a time, deepest level first
+    for level in range(int(depth.max(initial=0)), 0, -1):
+        node = np.flatnonzero(depth == level)
+        totals += np.bincount(parent[node], weights=totals[node], minlength=len(parent))
+    return totals
+
+def subtree_size(parent, depth=None):
+    """Number of employees in every employee's subtree (the employee included)"""
+    return subtree_sum(parent, np.ones(len(parent)), depth).astype(np.int64)
+
+def team_attrition_rate(parent, attrited, include_subtree=False):
+    """
+    Share of a manager's team that has left, NaN for employees without reports.
+
+    By default the team is the manager's direct reports; with include_subtree=True
+    it is everyone below the manager in the tree.
+    """
+    attrited = np.asarray(attrited, dtype=np.float64)
+
+    if include_subtree:
+        depth = node_depth(parent)
+        left = subtree_sum(parent, attrited, depth) - attrited
+        size = subtree_size(parent, depth) - 1
+    else:
+        has_manager = parent >= 0
+        left = np.bincount(parent[has_manager], weights=attrited[has_manager], minlength=len(parent))
+        size = team_size(parent)
+
+    rate = np.full(len(parent), np.nan)
+    np.divide(left, size, out=rate, where=size > 0)
+    return rate
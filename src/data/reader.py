@@ -0,0 +1,17 @@
+import pandas as pd
+
+# Rows per chunk when reading a dataset file
+DEFAULT_READ_CHUNK_SIZE = 500000
+
+def iter_input(path, columns, chunk_size=DEFAULT_READ_CHUNK_SIZE):
+    """
+    Read only the needed columns of a CSV or Parquet dataset in chunks. Compressed CSV
+    (.csv.gz, .csv.zst) is decompressed on the fly, picked by the file name suffix.
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
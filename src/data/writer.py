@@ -0,0 +1,130 @@
+import gzip
+import io
+import queue
+import threading
+
+# Supported output formats and compression codecs
+FORMATS = ['csv', 'parquet']
+COMPRESSIONS = ['none', 'gzip', 'zstd']
+
+# File name suffix of each compression for CSV output
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# Marker put on the queue to tell the background thread to finish
+_STOP = object()
+
+def import_zstandard():
+    """The optional zstandard module, with a clear error if it is not installed"""
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError("zstd compression requires the 'zstandard' package") from exc
+    return zstandard
+
+def open_output(path, compression='none'):
+    """Open a text handle for the output file, compressing on the fly if requested"""
+
+    if compression == 'none':
+        return open(path, 'w', newline='', encoding='utf-8')
+
+    if compression == 'gzip':
+        # Level 6 is the usual speed/size trade-off; zlib releases the GIL while compressing
+        return gzip.open(path, 'wt', newline='', encoding='utf-8', compresslevel=6)
+
+    if compression == 'zstd':
+        zstandard = import_zstandard()
+        raw = open(path, 'wb')
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(raw)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}")
+
+class BackgroundWriter:
+    """
+    Serialize and compress DataFrame chunks to a single CSV or Parquet file on a background thread.
+
+    The producer hands chunks over with write() and carries on generating the next
+    chunk while this thread formats and compresses the previous one. The queue is
+    bounded, so at most `max_queue` chunks wait in memory; write() blocks when the
+    writer falls behind.
+    """
+
+    def __init__(self, path, compression='none', max_queue=2, file_format='csv'):
+        if file_format not in FORMATS:
+            raise ValueError(f"Unknown format '{file_format}', expected one of {FORMATS}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}")
+
+        self.path = path
+        self.compression = compression
+        self.file_format = file_format
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._error = None
+        # The Parquet writer needs the first chunk's schema, so it is opened on the thread
+        self._handle = open_output(path, compression) if file_format == 'csv' else None
+        self._schema = None
+        self._thread = threading.Thread(target=self._run, name='dataset-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        header = True
+        while True:
+            chunk = self._queue.get()
+            if chunk is _STOP:
+                break
+            if self._error is not None:
+                # Keep draining so the producer never blocks on a dead writer
+                continue
+            try:
+                if self.file_format == 'csv':
+                    chunk.to_csv(self._handle, index=False, header=header)
+                    header = False
+                else:
+                    self._write_parquet(chunk)
+                self.rows_written += len(chunk)
+            except BaseException as exc:
+                self._error = exc
+
+    def _write_parquet(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._handle is None:
+            # A column that is all null in the first chunk has no type yet; the nullable
+            # object columns (dates, IDs, reasons) hold text, so it is written as string
+            self._schema = pa.schema(
+                [field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema],
+                metadata=table.schema.metadata,
+            )
+            self._handle = pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+        # A chunk infers its own types, e.g. null for a column that is all null in it
+        table = table.cast(self._schema)
+        # Each chunk becomes one row group
+        self._handle.write_table(table)
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise RuntimeError(f"Background writer failed for {self.path}") from self._error
+
+    def write(self, chunk):
+        """Queue a chunk for writing; blocks while the queue is full"""
+        self._raise_if_failed()
+        self._queue.put(chunk)
+
+    def close(self):
+        """Flush the remaining chunks, close the file and surface any writer error"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._handle is not None:
+            self._handle.close()
+        self._raise_if_failed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Covariates available for survival models. Departure details, dates, status flags,
+# identifiers and Tenure itself are left out because they encode the outcome.
+NUMERIC_FEATURES = [
+    'Age',
+    'CommuteDistance',
+    'JobLevel',
+    'PerformanceRating',
+    'EngagementScore',
+    'WorkLifeBalanceRating',
+    'JobSatisfaction',
+    'RelationshipWithManager',
+    'TrainingHoursLastYear',
+    'NumberOfPromotions',
+    'YearsSinceLastPromotion',
+    'YearsInCurrentRole',
+    'YearsWithCurrentManager',
+    'MonthsSinceLastSalaryChange',
+    'MonthlyIncome',
+    'PercentSalaryHikeLastYear',
+    'OvertimeHours'
+]
+
+CATEGORICAL_FEATURES = [
+    'Gender',
+    'Education',
+    'MaritalStatus',
+    'Department',
+    'JobRole',
+    'Region',
+    'BranchType',
+    'IsRemote',
+    'HighPotentialFlag'
+]
+
+# Separator between column and level in one-hot feature names, e.g. "Department=Sales"
+LEVEL_SEPARATOR = '='
+
+def survival_targets(df):
+    """Duration (Tenure in months) and event indicator (AttritionFlag == 'Yes') as arrays"""
+    time = df['Tenure'].to_numpy(dtype=np.float64)
+    event = (df['AttritionFlag'] == 'Yes').to_numpy()
+    return time, event
+
+def expand_features(df, numeric=NUMERIC_FEATURES, categorical=CATEGORICAL_FEATURES):
+    """
+    Feature names for the design matrix: numeric columns as-is, categorical columns
+    one-hot encoded as "Column=Level" for every observed level except the first
+    (sorted) one, which is the reference level.
+    """
+    names = list(numeric)
+    for col in categorical:
+        levels = sorted(df[col].dropna().unique())
+        names.extend(f'{col}{LEVEL_SEPARATOR}{level}' for level in levels[1:])
+    return names
+
+def required_columns(feature_names):
+    """Source columns needed to build the given features"""
+    columns = []
+    for name in feature_names:
+        col = name.split(LEVEL_SEPARATOR, 1)[0]
+        if col not in columns:
+            columns.append(col)
+    return columns
+
+# Rows per block when accumulating X^T W X over a design matrix, to bound temporary
+# memory to a few blocks of GRAM_CHUNK_SIZE x features floats
+GRAM_CHUNK_SIZE = 250000
+
+def design_matrix(df, feature_names, dtype=np.float64):
+    """
+    Build the (rows x features) design matrix for the given feature names.
+
+    Returned in column-major order, since model fitting and scoring walk it column
+    by column. Levels that are absent from `df` simply produce all-zero columns.
+    """
+    X = np.empty((len(df), len(feature_names)), dtype=dtype, order='F')
+    for j, name in enumerate(feature_names):
+        col, sep, level = name.partition(LEVEL_SEPARATOR)
+        if sep:
+            X[:, j] = (df[col] == level).to_numpy()
+        else:
+            X[:, j] = df[col].to_numpy(dtype=dtype)
+    return X
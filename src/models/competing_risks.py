@@ -0,0 +1,343 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.departure_reasons import INVOLUNTARY_REASONS, VOLUNTARY_REASONS
+from src.features.build_features import GRAM_CHUNK_SIZE, design_matrix
+from src.models.evaluation import censoring_survival, survival_before
+
+# Exit types per cause column, in the order of their cause codes (1, 2, ...; 0 is censored)
+CAUSES = {
+    'TurnoverCategory': ['Voluntary', 'Involuntary'],
+    'DepartureReason': VOLUNTARY_REASONS + INVOLUNTARY_REASONS,
+}
+
+# Share of a column's information left after the earlier columns below which it is aliased
+ALIAS_TOLERANCE = 1e-8
+
+class FineGrayResult(NamedTuple):
+    """Fitted Fine-Gray subdistribution hazard model"""
+    feature_names: tuple
+    coefficients: np.ndarray     # log subdistribution hazard ratios, NaN for aliased features
+    standard_errors: np.ndarray  # robust sandwich (Fine & Gray 1999), NaN for aliased features
+    log_likelihood: float
+    n_iter: int
+    converged: bool
+    aliased_features: tuple = ()  # linear combinations of earlier features, left out of the fit
+
+def cause_codes(df, cause_column='TurnoverCategory'):
+    """Integer exit type per employee: 0 for current employees, k for the k-th cause in CAUSES"""
+    causes = CAUSES[cause_column]
+    codes = pd.Categorical(df[cause_column], categories=causes).codes.astype(np.int64) + 1
+    return np.where((df['AttritionFlag'] == 'Yes').to_numpy(), codes, 0)
+
+def _strata(df, strata_column):
+    """Stratum label and row positions for every stratum (a single stratum if no column)"""
+    if strata_column is None:
+        return [(None, np.arange(len(df)))]
+    codes, labels = pd.factorize(df[strata_column], sort=True)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.cumsum(np.bincount(codes, minlength=len(labels)))[:-1]
+    return list(zip(labels, np.split(order, bounds)))
+
+def _aalen_johansen(time, cause, n_causes):
+    """Aalen-Johansen cumulative incidence of each cause at the distinct times, in one sorted pass"""
+    unique_time, inverse = np.unique(time, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    m = unique_time.size
+
+    at_risk = np.cumsum(np.bincount(inverse, minlength=m)[::-1])[::-1]
+    exits = np.bincount(inverse * (n_causes + 1) + cause, minlength=m * (n_causes + 1))
+    exits = exits.reshape(m, n_causes + 1)[:, 1:]
+    total_exits = exits.sum(axis=1)
+
+    # Overall survival just before each time, times the cause-specific hazard at that time
+    survival = np.cumprod(1 - total_exits / at_risk)
+    survival_prev = np.concatenate([[1.0], survival[:-1]])
+    cif = np.cumsum(survival_prev[:, None] * exits / at_risk[:, None], axis=0)
+
+    return unique_time, at_risk, total_exits, survival, cif
+
+def cumulative_incidence(df, cause_column='TurnoverCategory', strata_column=None):
+    """
+    Aalen-Johansen cumulative incidence of each exit type over Tenure.
+
+    Returns one row per distinct Tenure (per stratum when `strata_column`, e.g. 'Department',
+    is given) with the number at risk, exits, overall survival and a CIF_<cause> column per
+    exit type in CAUSES[cause_column]. Each stratum is a single bincount/cumsum pass, so the
+    cost is dominated by sorting the distinct tenures.
+    """
+    time = df['Tenure'].to_numpy()
+    cause = cause_codes(df, cause_column)
+    causes = CAUSES[cause_column]
+
+    tables = []
+    for label, rows in _strata(df, strata_column):
+        unique_time, at_risk, exits, survival, cif = _aalen_johansen(time[rows], cause[rows], len(causes))
+        table = pd.DataFrame({'Tenure': unique_time, 'AtRisk': at_risk, 'Exits': exits, 'Survival': survival})
+        for k, name in enumerate(causes):
+            table[f'CIF_{name}'] = cif[:, k]
+        if strata_column is not None:
+            table.insert(0, strata_column, label)
+        tables.append(table)
+
+    return pd.concat(tables, ignore_index=True)
+
+def _prepare_stratum(X, time, cause, cause_of_interest):
+    """
+    Everything about one stratum that does not depend on the coefficients.
+
+    Subjects are bucketed by the number of event times at or before their own time:
+    subject j is in the ordinary risk set of event times k < bucket_j, and a competing
+    exit stays in the risk set of event times k >= bucket_j with weight G(t_k-) / G(T_j-).
+    """
+    is_event = cause == cause_of_interest
+    is_competing = (cause > 0) & ~is_event
+
+    event_time, event_count = np.unique(time[is_event], return_counts=True)
+    censor_time, censor_survival = censoring_survival(time, cause > 0)
+
+    competing_weight = np.zeros(time.size)
+    competing_weight[is_competing] = 1 / survival_before(censor_time, censor_survival, time[is_competing])
+
+    # Censoring hazard at each distinct time, for the robust variance
+    censored = cause == 0
+    censor_index = np.searchsorted(censor_time, time)
+    censor_at_risk = np.cumsum(np.bincount(censor_index, minlength=censor_time.size)[::-1])[::-1]
+
+    return {
+        'X': X,
+        'bucket': np.searchsorted(event_time, time, side='right'),
+        'event_count': event_count,
+        'event_censor_survival': survival_before(censor_time, censor_survival, event_time),
+        'competing_weight': competing_weight,
+        'event_x_sum': X[is_event].sum(axis=0),
+        'is_event': is_event,
+        'censored': censored,
+        'censor_index': censor_index,
+        'censor_at_risk': censor_at_risk,
+        'censor_hazard': np.bincount(censor_index[censored], minlength=censor_time.size) / censor_at_risk,
+        'censor_next_event': np.searchsorted(event_time, censor_time, side='right'),
+    }
+
+def _bucket_sums(bucket, weights, n_buckets):
+    return np.bincount(bucket, weights=weights, minlength=n_buckets)
+
+def _risk_set_moments(stratum, beta):
+    """Relative risks (scaled by exp(-shift)) and S0, mean of X over the weighted risk set at every event time"""
+    X, bucket = stratum['X'], stratum['bucket']
+    g = stratum['event_censor_survival']
+    cw = stratum['competing_weight']
+    m = stratum['event_count'].size
+
+    eta = X @ beta
+    shift = eta.max()
+    r = np.exp(eta - shift)
+
+    # S0 and S1 at every event time: reverse cumulative bucket sums for the ordinary risk set,
+    # forward cumulative sums for the competing exits kept in with censoring weights
+    def risk_set_sum(weights):
+        ordinary = _bucket_sums(bucket, weights, m + 1)
+        competing = _bucket_sums(bucket, weights * cw, m + 1)
+        return np.cumsum(ordinary[::-1])[::-1][1:] + g * np.cumsum(competing)[:m]
+
+    s0 = risk_set_sum(r)
+    s1 = np.column_stack([risk_set_sum(r * X[:, j]) for j in range(X.shape[1])])
+    return r, shift, s0, s1 / s0[:, None]
+
+def _stratum_terms(stratum, beta):
+    """Log partial likelihood, score and information of one stratum (Breslow ties)"""
+    X, bucket = stratum['X'], stratum['bucket']
+    d = stratum['event_count']
+    g = stratum['event_censor_survival']
+    cw = stratum['competing_weight']
+    m = d.size
+    p = X.shape[1]
+    if m == 0:
+        return 0.0, np.zeros(p), np.zeros((p, p))
+
+    r, shift, s0, mean_x = _risk_set_moments(stratum, beta)
+
+    log_likelihood = stratum['event_x_sum'] @ beta - d @ (np.log(s0) + shift)
+    score = stratum['event_x_sum'] - d @ mean_x
+
+    # Sum over event times of S2/S0 folded into one weight per subject
+    a = d / s0
+    prefix = np.concatenate([[0.0], np.cumsum(a)])
+    suffix = np.concatenate([np.cumsum((a * g)[::-1])[::-1], [0.0]])
+    c = r * (prefix[bucket] + cw * suffix[bucket])
+
+    information = -(mean_x * d[:, None]).T @ mean_x
+    for start in range(0, X.shape[0], GRAM_CHUNK_SIZE):
+        block = X[start:start + GRAM_CHUNK_SIZE]
+        information += (block * c[start:start + GRAM_CHUNK_SIZE, None]).T @ block
+
+    return log_likelihood, score, information
+
+def _iter_score_residuals(stratum, beta):
+    """
+    Every subject's contribution to the score, in blocks of GRAM_CHUNK_SIZE rows.
+
+    A contribution is the subject's derivative of the score with respect to its case weight:
+    the usual Cox score residual (eta_i of Fine & Gray 1999) plus its effect through the
+    Kaplan-Meier censoring weights of the competing exits (psi_i). The sum of their outer
+    products is the middle of the robust sandwich variance.
+    """
+    X, bucket = stratum['X'], stratum['bucket']
+    d = stratum['event_count']
+    g = stratum['event_censor_survival']
+    cw = stratum['competing_weight']
+    p = X.shape[1]
+    if d.size == 0:
+        for start in range(0, X.shape[0], GRAM_CHUNK_SIZE):
+            yield np.zeros((min(GRAM_CHUNK_SIZE, X.shape[0] - start), p))
+        return
+
+    r, _, s0, mean_x = _risk_set_moments(stratum, beta)
+
+    # Breslow increments of the baseline, summed (plain and times mean_x) over the event times
+    # a subject is in the risk set of: k < bucket, then k >= bucket with weight g for competing exits
+    a = d / s0
+    a_prefix = np.concatenate([[0.0], np.cumsum(a)])
+    ax_prefix = np.vstack([np.zeros(p), np.cumsum(a[:, None] * mean_x, axis=0)])
+    ga_suffix = np.concatenate([np.cumsum((a * g)[::-1])[::-1], [0.0]])
+    gax_suffix = np.vstack([np.cumsum(((a * g)[:, None] * mean_x)[::-1], axis=0)[::-1], np.zeros(p)])
+
+    # q(u): derivative of the score with respect to the censoring hazard at each distinct time u,
+    # through the weights G(t_k-) / G(T_j-) of the competing exits with T_j <= u < t_k
+    hazard, at_risk = stratum['censor_hazard'], stratum['censor_at_risk']
+    index, next_event = stratum['censor_index'], stratum['censor_next_event']
+    competing = np.flatnonzero(cw)
+    rc = r[competing] * cw[competing]
+    exposed = np.cumsum(_bucket_sums(index[competing], rc, hazard.size))
+    exposed_x = np.cumsum(np.column_stack([
+        _bucket_sums(index[competing], rc * X[competing, j], hazard.size) for j in range(p)
+    ]), axis=0)
+    q = ga_suffix[next_event][:, None] * exposed_x - gax_suffix[next_event] * exposed[:, None]
+    # No event follows a time where every remaining subject is censored, so q is 0 there
+    q = np.divide(q, (1 - hazard)[:, None], out=np.zeros_like(q), where=(hazard < 1)[:, None])
+
+    # A subject moves the censoring hazard at u by (censored at u - at risk at u * hazard) / at risk
+    jump = q / at_risk[:, None]
+    compensator = np.cumsum(q * (hazard / at_risk)[:, None], axis=0)
+
+    for start in range(0, X.shape[0], GRAM_CHUNK_SIZE):
+        rows = slice(start, start + GRAM_CHUNK_SIZE)
+        block, b, w = X[rows], bucket[rows], cw[rows]
+        exposure = a_prefix[b] + w * ga_suffix[b]
+        exposure_x = ax_prefix[b] + w[:, None] * gax_suffix[b]
+        residual = -r[rows, None] * (block * exposure[:, None] - exposure_x)
+
+        events = np.flatnonzero(stratum['is_event'][rows])
+        residual[events] += block[events] - mean_x[b[events] - 1]
+
+        i = index[rows]
+        censored = np.flatnonzero(stratum['censored'][rows])
+        residual[censored] += jump[i[censored]]
+        residual -= compensator[i]
+        yield residual
+
+def _aliased_columns(information, bound):
+    """
+    Columns that are linear combinations of earlier columns (or constant within every stratum),
+    taking the columns in order and keeping those that add information. `bound` is an upper
+    bound of each diagonal entry, the scale against which a constant column's is roundoff.
+    """
+    kept, aliased = [], []
+    for j in range(information.shape[0]):
+        explained = 0.0
+        if kept:
+            cross = information[kept, j]
+            explained = cross @ np.linalg.solve(information[np.ix_(kept, kept)], cross)
+        if (information[j, j] <= ALIAS_TOLERANCE * bound[j]
+                or information[j, j] - explained <= ALIAS_TOLERANCE * information[j, j]):
+            aliased.append(j)
+        else:
+            kept.append(j)
+    return kept, aliased
+
+def fit_fine_gray(df, feature_names, cause='Voluntary', cause_column='TurnoverCategory',
+                  strata_column=None, max_iter=50, tol=1e-9):
+    """
+    Fit a Fine-Gray subdistribution hazard model for one exit type by Newton-Raphson.
+
+    Employees who left for another reason stay in the risk set with inverse probability of
+    censoring weights (Kaplan-Meier of the censoring distribution, per stratum). With
+    `strata_column` the partial likelihood is stratified, each stratum keeping its own
+    baseline. Every iteration is a few bincount/cumsum passes over Tenure buckets plus one
+    X^T W X product, so the cost is linear in the number of rows.
+
+    Features that are linear combinations of earlier ones (e.g. a full set of one-hot
+    columns) are left out and listed in `aliased_features`. Standard errors are the robust
+    sandwich estimate, which accounts for the estimated censoring weights as in cmprsk::crr.
+    """
+    X = design_matrix(df, feature_names)
+    time = df['Tenure'].to_numpy(dtype=np.float64)
+    codes = cause_codes(df, cause_column)
+    cause_of_interest = CAUSES[cause_column].index(cause) + 1
+
+    strata = [
+        _prepare_stratum(np.asfortranarray(X[rows]) if strata_column else X, time[rows], codes[rows], cause_of_interest)
+        for _, rows in _strata(df, strata_column)
+    ]
+
+    def terms(beta):
+        total_ll, total_score, total_info = 0.0, 0.0, 0.0
+        for stratum in strata:
+            ll, score, info = _stratum_terms(stratum, beta)
+            total_ll, total_score, total_info = total_ll + ll, total_score + score, total_info + info
+        return total_ll, total_score, total_info
+
+    # Aliased columns make the information singular; fit without them
+    p = len(feature_names)
+    log_likelihood, score, information = terms(np.zeros(p))
+    # The information's diagonal sums a risk-set variance per event, at most max(x^2) each
+    n_events = sum(stratum['event_count'].sum() for stratum in strata)
+    kept, aliased = _aliased_columns(information, n_events * np.abs(X).max(axis=0, initial=0) ** 2)
+    if aliased:
+        strata = [
+            {**stratum, 'X': np.asfortranarray(stratum['X'][:, kept]), 'event_x_sum': stratum['event_x_sum'][kept]}
+            for stratum in strata
+        ]
+        log_likelihood, score, information = terms(np.zeros(len(kept)))
+
+    beta = np.zeros(len(kept))
+    converged = False
+    for n_iter in range(1, max_iter + 1):
+        step = np.linalg.solve(information, score)
+        # Halve the step until the likelihood does not decrease
+        for _ in range(20):
+            new_ll, new_score, new_info = terms(beta + step)
+            if new_ll >= log_likelihood - 1e-12:
+                break
+            step /= 2
+        beta = beta + step
+        improvement = new_ll - log_likelihood
+        log_likelihood, score, information = new_ll, new_score, new_info
+        if abs(improvement) < tol or np.max(np.abs(step)) < tol:
+            converged = True
+            break
+
+    # Robust sandwich variance: inverse information around the outer products of the
+    # subjects' score contributions, which include the estimated censoring weights
+    meat = np.zeros((len(kept), len(kept)))
+    for stratum in strata:
+        for residual in _iter_score_residuals(stratum, beta):
+            meat += residual.T @ residual
+    bread = np.linalg.inv(information)
+
+    coefficients = np.full(p, np.nan)
+    standard_errors = np.full(p, np.nan)
+    coefficients[kept] = beta
+    standard_errors[kept] = np.sqrt(np.diag(bread @ meat @ bread))
+
+    return FineGrayResult(
+        feature_names=tuple(feature_names),
+        coefficients=coefficients,
+        standard_errors=standard_errors,
+        log_likelihood=float(log_likelihood),
+        n_iter=n_iter,
+        converged=converged,
+        aliased_features=tuple(feature_names[j] for j in aliased),
+    )
@@ -0,0 +1,246 @@
+import numpy as np
+
+# Tenure horizons (months) at which time-dependent AUC is reported by default
+DEFAULT_AUC_HORIZONS = [6, 12, 24, 36]
+
+# Most distinct tenures for which the C-index uses the per-tenure Fenwick sweep
+MAX_SWEEP_TIMES = 2000
+
+def _fenwick_add(tree, positions):
+    """Add 1 at each (1-based) position of a Fenwick tree; positions may repeat"""
+    positions, counts = np.unique(positions, return_counts=True)
+    while positions.size:
+        # Distinct positions can share a parent, so accumulate instead of assigning
+        np.add.at(tree, positions, counts)
+        positions = positions + (positions & -positions)
+        inside = positions < tree.size
+        positions, counts = positions[inside], counts[inside]
+
+def _fenwick_prefix(tree, positions):
+    """Sum of the Fenwick tree over 1..position for each (1-based) position"""
+    totals = np.zeros(positions.size, dtype=np.int64)
+    positions = positions.copy()
+    active = np.flatnonzero(positions > 0)
+    while active.size:
+        totals[active] += tree[positions[active]]
+        positions[active] -= positions[active] & -positions[active]
+        active = active[positions[active] > 0]
+    return totals
+
+def _concordance_sweep(time, event, rank):
+    """
+    Concordant, tied and comparable pair counts by a sweep from the longest tenure down.
+
+    A Fenwick tree over score ranks holds everyone with a longer tenure; each distinct
+    tenure is one vectorized batch, so this is fast when there are few distinct tenures
+    (Tenure in whole months has a few hundred whatever the number of rows).
+    """
+    tree = np.zeros(int(rank.max(initial=0)) + 2, dtype=np.int64)
+    rank = rank + 1  # 1-based positions in the tree
+
+    order = np.argsort(-time, kind='stable')
+    sorted_time, sorted_event, sorted_rank = time[order], event[order], rank[order]
+    bounds = np.flatnonzero(np.diff(sorted_time)) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [time.size]])
+
+    concordant = tied = comparable = 0
+    in_tree = 0
+    for start, stop in zip(starts, stops):
+        group_event = sorted_event[start:stop]
+        group_rank = sorted_rank[start:stop]
+        censored_rank = group_rank[~group_event]
+        exit_rank = group_rank[group_event]
+
+        # Censored at this tenure are comparable with the exits at this tenure
+        if censored_rank.size:
+            _fenwick_add(tree, censored_rank)
+            in_tree += censored_rank.size
+
+        if exit_rank.size:
+            lower = _fenwick_prefix(tree, exit_rank - 1)
+            lower_or_equal = _fenwick_prefix(tree, exit_rank)
+            concordant += int(lower.sum())
+            tied += int((lower_or_equal - lower).sum())
+            comparable += in_tree * exit_rank.size
+            _fenwick_add(tree, exit_rank)
+            in_tree += exit_rank.size
+
+    return concordant, tied, comparable
+
+def _smaller_before(values):
+    """
+    For each position, the number of earlier positions with a smaller value and with a
+    smaller or equal value.
+
+    One stable sort by value, then a top-down pass over the bits of the positions: at
+    each level every block's entries, kept in sorted order, are stably split into the
+    left and right half blocks with cumulative sums, and each right-half entry picks up
+    the left-half entries sorted before it (the earlier smaller or equal values). That is
+    O(n log n) overall with O(n) vectorized work per level and no sort or search after the
+    first one.
+    """
+    n = values.size
+    by_value = np.argsort(values, kind='stable').astype(np.int32)
+    order = by_value.copy()
+    counts = np.zeros(n, dtype=np.int32)
+
+    index = np.arange(n, dtype=np.int32)
+    for shift in range(max(n - 1, 0).bit_length() - 1, -1, -1):
+        # `order` holds the positions grouped by block of 2 << shift, sorted by value within;
+        # blocks are contiguous runs of positions, so a block starts at its first position
+        block_start = (order >> (shift + 1)) << (shift + 1)
+        right = (order >> shift) & 1
+        right_before = np.cumsum(right, dtype=np.int32)
+        right_before -= right
+        right_before -= right_before[block_start]
+        left_before = index - block_start - right_before
+        counts += left_before * right
+
+        # Stable split: left-half entries first, then right-half entries, each in value order
+        n_left = np.minimum(n - block_start, 1 << shift)
+        split = np.where(right, block_start + n_left + right_before, block_start + left_before)
+        order[split] = order.copy()
+        counts[split] = counts.copy()
+
+    # After the last split `order` is the identity, so `counts` lines up with the positions
+    lower_or_equal = counts.astype(np.int64)
+
+    # Earlier positions with the same value come first among equal values in the sort
+    equal_before = np.empty(n, dtype=np.int64)
+    equal_before[by_value] = _rank_within_runs(values[by_value])
+    return lower_or_equal - equal_before, lower_or_equal
+
+def _rank_within_runs(*keys):
+    """Position of every element within its run of equal consecutive keys"""
+    n = keys[0].size
+    same = np.zeros(n, dtype=bool)
+    same[1:] = True
+    for key in keys:
+        same[1:] &= key[1:] == key[:-1]
+    run_start = np.maximum.accumulate(np.where(same, 0, np.arange(n)))
+    return np.arange(n) - run_start
+
+def _concordance_blocks(time_rank, event, rank):
+    """
+    Concordant, tied and comparable pair counts for many distinct tenures.
+
+    Employees are ordered from the longest tenure down (censored before exits at equal
+    tenure, exits at equal tenure highest score first), so the employees compared with an
+    exit are the ones before it, and earlier lower scores are counted for all positions at once.
+    """
+    # One sort on a combined key instead of a three-key lexsort
+    n_times, n_ranks = time_rank.max() + 1, rank.max() + 1
+    key = ((n_times - 1 - time_rank) * 2 + event) * n_ranks + (n_ranks - 1 - rank)
+    order = np.argsort(key)
+    sorted_time, sorted_event, sorted_rank = time_rank[order], event[order], rank[order]
+    lower, lower_or_equal = _smaller_before(sorted_rank)
+
+    exits = np.flatnonzero(sorted_event)
+    exit_time, exit_rank = sorted_time[exits], sorted_rank[exits]
+
+    # Earlier exits at the same tenure (not comparable), and those with the same score too
+    same_time_before = _rank_within_runs(exit_time)
+    same_time_and_score_before = _rank_within_runs(exit_time, exit_rank)
+
+    concordant = int(lower[exits].sum())
+    tied = int((lower_or_equal[exits] - lower[exits] - same_time_and_score_before).sum())
+    comparable = int((exits - same_time_before).sum())
+    return concordant, tied, comparable
+
+def concordance_index(time, event, risk):
+    """
+    Harrell's C-index of risk scores, where a higher score means an earlier expected exit.
+
+    A pair (i, j) is comparable when i exited first: event_i and T_i < T_j, or T_i == T_j
+    with j censored (an employee censored at the same tenure is taken to have stayed at
+    least as long). Ties in score count as half-concordant; pairs of exits at the same
+    tenure are not comparable.
+
+    With up to MAX_SWEEP_TIMES distinct tenures (always the case for Tenure in months)
+    the pairs are counted by an O(n log n) Fenwick-tree sweep with one batch per tenure;
+    otherwise by an O(n log n) block count whose cost does not depend on the number of
+    distinct tenures.
+    """
+    time = np.asarray(time)
+    event = np.asarray(event, dtype=bool)
+    risk = np.asarray(risk)
+
+    # Dense ranks of the scores
+    rank = np.unique(risk, return_inverse=True)[1].reshape(-1)
+
+    unique_time, time_rank = np.unique(time, return_inverse=True)
+    if unique_time.size <= MAX_SWEEP_TIMES:
+        concordant, tied, comparable = _concordance_sweep(time, event, rank)
+    else:
+        time_rank = time_rank.reshape(-1).astype(np.int64)
+        concordant, tied, comparable = _concordance_blocks(time_rank, event, rank)
+
+    if comparable == 0:
+        return np.nan
+    return (concordant + 0.5 * tied) / comparable
+
+def censoring_survival(time, event):
+    """
+    Kaplan-Meier estimate of the censoring distribution G(t) = P(C > t).
+
+    Returns the distinct times and G just after each of them. Exits are taken to happen
+    before censoring at the same time.
+    """
+    time = np.asarray(time)
+    event = np.asarray(event, dtype=bool)
+    unique_time, inverse = np.unique(time, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    at_risk = np.cumsum(np.bincount(inverse, minlength=unique_time.size)[::-1])[::-1]
+    censored = np.bincount(inverse[~event], minlength=unique_time.size)
+    return unique_time, np.cumprod(1 - censored / at_risk)
+
+def survival_before(times, survival, t):
+    """Value of a right-continuous step function just before each t (1 before the first step)"""
+    index = np.searchsorted(times, t, side='left') - 1
+    return np.where(index >= 0, survival[np.maximum(index, 0)], 1.0)
+
+def cumulative_dynamic_auc(time, event, risk, horizons=DEFAULT_AUC_HORIZONS, ipcw=True):
+    """
+    Cumulative/dynamic time-dependent AUC at each horizon t.
+
+    Cases are employees who exited by t (T_i <= t, event_i), controls are those still
+    employed after t (T_j > t). The AUC is the probability that a case scores higher
+    than a control, with ties counted as half. With ipcw=True cases are weighted by
+    1 / G(T_i-), the inverse probability of remaining uncensored (Uno et al.), which
+    corrects for employees censored before t. Each horizon costs one sort of the
+    controls' scores and a binary search per case: O(n log n).
+    """
+    time = np.asarray(time)
+    event = np.asarray(event, dtype=bool)
+    risk = np.asarray(risk)
+
+    if ipcw:
+        censor_time, censor_survival = censoring_survival(time, event)
+
+    auc = np.full(len(horizons), np.nan)
+    for k, horizon in enumerate(horizons):
+        is_case = event & (time <= horizon)
+        control_risk = np.sort(risk[time > horizon])
+        if not is_case.any() or control_risk.size == 0:
+            continue
+
+        case_risk = risk[is_case]
+        if ipcw:
+            weight = 1 / survival_before(censor_time, censor_survival, time[is_case])
+        else:
+            weight = np.ones(case_risk.size)
+
+        lower = np.searchsorted(control_risk, case_risk, side='left')
+        lower_or_equal = np.searchsorted(control_risk, case_risk, side='right')
+        wins = lower + 0.5 * (lower_or_equal - lower)
+        auc[k] = (weight @ wins) / (weight.sum() * control_risk.size)
+
+    return auc
+
+def evaluate_risk_scores(time, event, risk, horizons=DEFAULT_AUC_HORIZONS):
+    """C-index and time-dependent AUCs of one set of risk scores, as a flat dict for model comparison"""
+    metrics = {'c_index': concordance_index(time, event, risk)}
+    for horizon, auc in zip(horizons, cumulative_dynamic_auc(time, event, risk, horizons)):
+        metrics[f'auc_{horizon}m'] = float(auc)
+    return metrics
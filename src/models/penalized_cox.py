@@ -0,0 +1,323 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+from src.features.build_features import GRAM_CHUNK_SIZE, design_matrix, expand_features, survival_targets
+
+# Defaults for the regularization path
+DEFAULT_N_LAMBDAS = 100
+DEFAULT_LAMBDA_MIN_RATIO = 1e-3
+DEFAULT_N_FOLDS = 10
+
+class CoxPathResult(NamedTuple):
+    """Elastic-net Cox regularization path with cross-validation results"""
+    feature_names: tuple
+    alpha: float
+    lambdas: np.ndarray            # decreasing penalty strengths
+    coefficients: np.ndarray       # (n_lambdas, n_features) log hazard ratios, original feature scale
+    log_likelihood: np.ndarray     # full-data log partial likelihood along the path
+    cv_deviance: np.ndarray        # cross-validated partial likelihood deviance per event (NaN without CV)
+    cv_se: np.ndarray              # standard error of cv_deviance across folds
+    index_min: int                 # lambda with the lowest CV deviance
+    index_1se: int                 # largest lambda within one standard error of the minimum
+
+def _tie_groups(time):
+    """Index of every row's group of tied times, for times sorted ascending"""
+    new_group = np.ones(time.size, dtype=bool)
+    new_group[1:] = time[1:] != time[:-1]
+    return np.cumsum(new_group) - 1
+
+def _breslow_terms(eta, data, mask):
+    """
+    Log partial likelihood (Breslow ties) and its gradient in eta for the rows selected by
+    `mask` (0/1 weights), plus the risk-set sums the Hessian is built from.
+
+    Rows are sorted by time, so the risk-set sum of each tie group is a reverse cumulative
+    sum over groups and the sum of 1/S0 over earlier exits a forward cumulative sum.
+    """
+    group = data['group']
+    n_groups = group[-1] + 1
+    event = data['event'] * mask
+    shift = np.max(eta, where=mask > 0, initial=-np.inf)
+    r = np.exp(eta - shift) * mask
+
+    s0 = np.cumsum(np.bincount(group, weights=r, minlength=n_groups)[::-1])[::-1]
+    exits = np.bincount(group, weights=event, minlength=n_groups)
+    # Groups outside the mask can have an empty risk set; they carry no exit, so divide by 1
+    s0 = np.where(exits > 0, s0, 1.0)
+    exits_over_s0 = np.cumsum(exits / s0)[group]
+
+    gradient = event - r * exits_over_s0
+    log_likelihood = event @ (eta - shift) - exits @ np.log(s0)
+    state = {'r': r, 's0': s0, 'exits': exits, 'exits_over_s0': exits_over_s0}
+
+    return log_likelihood, gradient, state
+
+def _hessian(X, columns, data, state):
+    """
+    Negative Hessian of the log partial likelihood for the given columns:
+    X^T diag(r * sum_{exits before} 1/S0) X - sum over exit times of d * m m^T, m = S1 / S0.
+
+    Rows are sorted by time, so the per-group sums behind S1 come out of the same blocks
+    as X^T W X with one reduceat per block.
+    """
+    group = data['group']
+    n_groups = group[-1] + 1
+    r, s0, exits = state['r'], state['s0'], state['exits']
+    weight = r * state['exits_over_s0']
+
+    hessian = np.zeros((len(columns), len(columns)))
+    s1 = np.zeros((n_groups, len(columns)))
+    for start in range(0, X.shape[0], GRAM_CHUNK_SIZE):
+        rows = slice(start, start + GRAM_CHUNK_SIZE)
+        block = X[rows][:, columns]
+        hessian += (block * weight[rows, None]).T @ block
+
+        block_group = group[rows]
+        group_starts = np.flatnonzero(np.diff(block_group, prepend=-1))
+        # A group split across two blocks gets both partial sums
+        s1[block_group[group_starts]] += np.add.reduceat(block * r[rows, None], group_starts, axis=0)
+
+    has_exit = exits > 0
+    s1 = np.cumsum(s1[::-1], axis=0)[::-1][has_exit]
+    mean_x = s1 / s0[has_exit, None]
+    hessian -= (mean_x * exits[has_exit, None]).T @ mean_x
+
+    return hessian
+
+def _soft_threshold(value, threshold):
+    return np.sign(value) * max(abs(value) - threshold, 0.0)
+
+def _penalty(beta, l1, l2):
+    return l1 * np.abs(beta).sum() + 0.5 * l2 * (beta @ beta)
+
+def _covariance_descent(hessian, score, beta, start, l1, l2, n, tol, max_sweeps):
+    """
+    Coordinate descent on the penalized quadratic model -(score.d - d^T H d / 2) / n + penalty,
+    d = beta - start, updating beta in place. Works on the small Hessian only, so a sweep
+    costs O(k^2) for k candidate features regardless of the number of rows.
+    """
+    curvature = np.diag(hessian) / n
+    h_delta = hessian @ (beta - start)
+    for _ in range(max_sweeps):
+        largest_change = 0.0
+        for k in range(beta.size):
+            if curvature[k] + l2 <= 0:
+                continue
+            old = beta[k]
+            new = _soft_threshold((score[k] - h_delta[k]) / n + curvature[k] * old, l1) / (curvature[k] + l2)
+            if new != old:
+                h_delta += hessian[:, k] * (new - old)
+                beta[k] = new
+                largest_change = max(largest_change, curvature[k] * (new - old) ** 2)
+        if largest_change < tol:
+            break
+
+def _proximal_newton(X, data, mask, beta, eta, columns, l1, l2, n, tol, max_iter):
+    """
+    Minimize -loglik / n + penalty over `columns` by proximal Newton steps with backtracking,
+    updating beta and eta = X @ beta in place. Returns the log-likelihood and eta-gradient
+    at the solution.
+    """
+    log_likelihood, gradient, state = _breslow_terms(eta, data, mask)
+    objective = -log_likelihood / n + _penalty(beta, l1, l2)
+
+    for _ in range(max_iter):
+        score = np.array([X[:, k] @ gradient for k in columns])
+        hessian = _hessian(X, columns, data, state)
+        start = beta[columns]
+        target = start.copy()
+        _covariance_descent(hessian, score, target, start, l1, l2, n, tol, 100 * len(columns) + 100)
+
+        direction = target - start
+        if not direction.any():
+            break
+        eta_direction = np.zeros_like(eta)
+        for k, d in zip(columns, direction):
+            if d:
+                eta_direction += X[:, k] * d
+
+        # Halve the step until the penalized objective does not increase
+        step = 1.0
+        candidate = beta.copy()
+        for _ in range(30):
+            candidate[columns] = start + step * direction
+            new_eta = eta + step * eta_direction
+            new_ll, new_gradient, new_state = _breslow_terms(new_eta, data, mask)
+            new_objective = -new_ll / n + _penalty(candidate, l1, l2)
+            if new_objective <= objective + 1e-12 * abs(objective):
+                break
+            step /= 2
+
+        beta[:] = candidate
+        eta[:] = new_eta
+        improvement = objective - new_objective
+        log_likelihood, gradient, state, objective = new_ll, new_gradient, new_state, new_objective
+        if improvement <= tol * abs(objective):
+            break
+
+    return log_likelihood, gradient
+
+def _fit_path(data, mask, lambdas, alpha, tol, max_iter, full_likelihood=False):
+    """
+    Elastic-net Cox fit for every lambda, warm-starting from the previous solution.
+
+    The sequential strong rule picks candidate features for each lambda, proximal Newton
+    steps fit them, and a KKT check on the remaining features adds any the rule missed.
+    Returns the coefficients (standardized scale) and the training log-likelihoods along
+    the path, plus the full-data log-likelihoods when `full_likelihood` is set (None
+    otherwise).
+    """
+    X = data['X']
+    n_features = X.shape[1]
+    n = mask.sum()
+    full = np.ones_like(mask)
+
+    beta = np.zeros(n_features)
+    eta = np.zeros(X.shape[0])
+    coefficients = np.zeros((len(lambdas), n_features))
+    train_ll = np.zeros(len(lambdas))
+    full_ll = np.zeros(len(lambdas)) if full_likelihood else None
+
+    _, gradient, _ = _breslow_terms(eta, data, mask)
+    correlation = np.abs(X.T @ gradient) / n
+    previous_lambda = lambdas[0]
+
+    for i, lam in enumerate(lambdas):
+        l1, l2 = lam * alpha, lam * (1 - alpha)
+        strong = correlation >= alpha * (2 * lam - previous_lambda)
+        candidates = np.union1d(np.flatnonzero(strong), np.flatnonzero(beta))
+
+        while True:
+            if candidates.size:
+                train_ll[i], gradient = _proximal_newton(X, data, mask, beta, eta, candidates, l1, l2, n, tol, max_iter)
+            else:
+                train_ll[i], gradient, _ = _breslow_terms(eta, data, mask)
+
+            # KKT check for the features the strong rule left out
+            correlation = np.abs(X.T @ gradient) / n
+            violators = np.setdiff1d(np.flatnonzero(correlation > l1 * (1 + 1e-6)), candidates)
+            if not violators.size:
+                break
+            candidates = np.union1d(candidates, violators)
+
+        coefficients[i] = beta
+        if full_likelihood:
+            full_ll[i] = _breslow_terms(eta, data, full)[0]
+        previous_lambda = lam
+
+    return coefficients, train_ll, full_ll
+
+# Arrays attached from shared memory in each worker process
+_SHARED = {}
+
+def _share(arrays):
+    """Copy arrays into shared memory blocks; returns the blocks and specs to reattach them"""
+    blocks, specs = [], {}
+    for key, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        order = 'F' if array.flags.f_contiguous and array.ndim > 1 else 'C'
+        np.ndarray(array.shape, array.dtype, buffer=block.buf, order=order)[...] = array
+        blocks.append(block)
+        specs[key] = (block.name, array.shape, array.dtype.str, order)
+    return blocks, specs
+
+def _attach_shared(specs):
+    """Worker initializer: map the shared design arrays without copying them"""
+    for key, (name, shape, dtype, order) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        _SHARED[key + '_block'] = block
+        _SHARED[key] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf, order=order)
+
+def _fit_fold(fold, lambdas, alpha, tol, max_iter):
+    """Fit the path without one fold; returns its Verweij-van Houwelingen CV log-likelihood"""
+    mask = (_SHARED['folds'] != fold).astype(np.float64)
+    _, train_ll, full_ll = _fit_path(_SHARED, mask, lambdas, alpha, tol, max_iter, full_likelihood=True)
+    return full_ll - train_ll
+
+def fit_cox_path(df, feature_names=None, alpha=0.5, n_lambdas=DEFAULT_N_LAMBDAS,
+                 lambda_min_ratio=DEFAULT_LAMBDA_MIN_RATIO, n_folds=DEFAULT_N_FOLDS,
+                 n_workers=None, random_seed=42, tol=1e-7, max_iter=100):
+    """
+    Fit an elastic-net penalized Cox model over a decreasing lambda path, with K-fold CV.
+
+    The penalty is lambda * (alpha * |beta|_1 + (1 - alpha) / 2 * |beta|_2^2) on standardized
+    features (alpha=1 is the lasso). Each lambda warm-starts from the previous solution and
+    takes a few proximal Newton steps on the strong-rule candidates; the gradient and Hessian
+    come from cumulative risk-set sums over rows sorted by Tenure, so a step costs one pass
+    over the candidate columns and the coordinate descent inside it never touches the rows.
+    Folds run in a process pool that maps the standardized
+    design matrix from shared memory instead of pickling a copy per task; the cross-validated
+    deviance follows Verweij and van Houwelingen (full-data minus training log-likelihood of
+    each fold's fit). Feature names default to expand_features(df).
+
+    Coefficients at result.index_1se (or index_min) can be passed to
+    src.models.scoring.build_model for batch scoring.
+    """
+    if feature_names is None:
+        feature_names = expand_features(df)
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+
+    time, event = survival_targets(df)
+    order = np.argsort(time, kind='stable')
+    time, event = time[order], event[order].astype(np.float64)
+
+    X = design_matrix(df, feature_names)[order]
+    means = X.mean(axis=0)
+    scales = X.std(axis=0)
+    scales[scales == 0] = 1
+    X = np.asfortranarray((X - means) / scales)
+
+    folds = np.random.default_rng(random_seed).integers(0, max(n_folds, 1), size=time.size)
+    data = {'X': X, 'event': event, 'group': _tie_groups(time), 'folds': folds}
+
+    # Lambda path from the smallest penalty that keeps every coefficient at zero
+    n = time.size
+    _, gradient, _ = _breslow_terms(np.zeros(n), data, np.ones(n))
+    lambda_max = np.max(np.abs(X.T @ gradient)) / (n * alpha)
+    lambdas = lambda_max * np.logspace(0, np.log10(lambda_min_ratio), n_lambdas)
+
+    coefficients, log_likelihood, _ = _fit_path(data, np.ones(n), lambdas, alpha, tol, max_iter)
+
+    cv_deviance = np.full(n_lambdas, np.nan)
+    cv_se = np.full(n_lambdas, np.nan)
+    index_min = index_1se = n_lambdas - 1
+    if n_folds > 1:
+        blocks, specs = _share(data)
+        try:
+            n_workers = n_workers or min(n_folds, os.cpu_count() or 1)
+            with ProcessPoolExecutor(n_workers, initializer=_attach_shared, initargs=(specs,)) as pool:
+                fit_fold = partial(_fit_fold, lambdas=lambdas, alpha=alpha, tol=tol, max_iter=max_iter)
+                fold_ll = np.array(list(pool.map(fit_fold, range(n_folds))))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        # Deviance per event in each fold, weighted by the fold's number of events
+        fold_events = np.bincount(folds, weights=event, minlength=n_folds)[:, None]
+        fold_deviance = -2 * fold_ll / fold_events
+        weights = fold_events / fold_events.sum()
+        cv_deviance = (weights * fold_deviance).sum(axis=0)
+        variance = (weights * (fold_deviance - cv_deviance) ** 2).sum(axis=0) / (n_folds - 1)
+        cv_se = np.sqrt(variance)
+
+        index_min = int(np.argmin(cv_deviance))
+        index_1se = int(np.flatnonzero(cv_deviance <= cv_deviance[index_min] + cv_se[index_min])[0])
+
+    return CoxPathResult(
+        feature_names=tuple(feature_names),
+        alpha=alpha,
+        lambdas=lambdas,
+        coefficients=coefficients / scales,
+        log_likelihood=log_likelihood,
+        cv_deviance=cv_deviance,
+        cv_se=cv_se,
+        index_min=index_min,
+        index_1se=index_1se,
+    )
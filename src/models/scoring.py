@@ -0,0 +1,156 @@
+import functools
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.data.reader import iter_input
+from src.data.writer import BackgroundWriter
+from src.features.build_features import design_matrix, required_columns, survival_targets
+
+# Exit-risk horizons in months
+DEFAULT_HORIZONS = [3, 6, 12]
+
+# Rows read, scored and written per batch
+DEFAULT_SCORING_CHUNK_SIZE = 500000
+
+class RiskModel(NamedTuple):
+    """Proportional hazards model in the form needed for scoring"""
+    feature_names: tuple
+    coefficients: np.ndarray     # log hazard ratios, one per feature
+    offsets: np.ndarray          # covariate values the baseline hazard refers to (training means)
+    baseline_cumhaz: np.ndarray  # baseline cumulative hazard at tenure months 0, 1, ..., len - 1
+
+def breslow_cumulative_hazard(time, event, linear_predictor, max_month=None):
+    """
+    Breslow estimate of the baseline cumulative hazard on the integer month grid 0..max_month.
+
+    Durations are floored to whole months; everyone with duration >= m is at risk at month m.
+    Computed with one bincount and two cumulative sums, so it is linear in the number of rows.
+    """
+    months = np.floor(np.asarray(time)).astype(np.int64)
+    event = np.asarray(event, dtype=bool)
+    if max_month is None:
+        max_month = int(months.max())
+    length = max(int(months.max()), max_month) + 1
+
+    risk_by_month = np.bincount(months, weights=np.exp(linear_predictor), minlength=length)
+    at_risk = np.cumsum(risk_by_month[::-1])[::-1]
+    exits = np.bincount(months[event], minlength=length)
+    hazard = np.divide(exits, at_risk, out=np.zeros(length), where=at_risk > 0)
+
+    return np.cumsum(hazard)[:max_month + 1]
+
+def build_model(df, feature_names, coefficients, max_month=None):
+    """Precompute the baseline cumulative hazard grid for fitted coefficients on training data"""
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    X = design_matrix(df, feature_names)
+    offsets = X.mean(axis=0)
+    time, event = survival_targets(df)
+    linear_predictor = X @ coefficients - offsets @ coefficients
+
+    return RiskModel(
+        feature_names=tuple(feature_names),
+        coefficients=coefficients,
+        offsets=offsets,
+        baseline_cumhaz=breslow_cumulative_hazard(time, event, linear_predictor, max_month),
+    )
+
+def save_model(model, path):
+    """Save a RiskModel as an uncompressed .npz archive (plain arrays, no pickling)"""
+    with open(path, 'wb') as f:
+        np.savez(
+            f,
+            feature_names=np.array(model.feature_names, dtype=str),
+            coefficients=model.coefficients,
+            offsets=model.offsets,
+            baseline_cumhaz=model.baseline_cumhaz,
+        )
+
+@functools.lru_cache(maxsize=8)
+def _load_model(path, mtime_ns):
+    with np.load(path, allow_pickle=False) as archive:
+        model = RiskModel(
+            feature_names=tuple(archive['feature_names'].tolist()),
+            coefficients=archive['coefficients'],
+            offsets=archive['offsets'],
+            baseline_cumhaz=archive['baseline_cumhaz'],
+        )
+    # Every caller shares the cached arrays, so none of them may modify them in place
+    for array in model[1:]:
+        array.setflags(write=False)
+    return model
+
+def load_model(path):
+    """Load a RiskModel saved by save_model; cached until the file changes"""
+    return _load_model(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+def score_frame(model, df, horizons=DEFAULT_HORIZONS):
+    """
+    Conditional exit risk within each horizon for employees still employed at their Tenure.
+
+    Risk within h months is 1 - exp(-(H0(t + h) - H0(t)) * exp((x - offsets) . beta)), so each
+    row costs a dot product and two lookups into the baseline grid. Beyond the end of the grid
+    the baseline hazard is treated as flat.
+    """
+    X = design_matrix(df, model.feature_names)
+    relative_risk = np.exp(X @ model.coefficients - model.offsets @ model.coefficients)
+
+    cumhaz = model.baseline_cumhaz
+    last = len(cumhaz) - 1
+    tenure = np.clip(df['Tenure'].to_numpy(dtype=np.int64), 0, last)
+
+    scored = pd.DataFrame({
+        'EmployeeID': df['EmployeeID'].to_numpy(),
+        'Tenure': df['Tenure'].to_numpy(),
+        'RelativeRisk': relative_risk,
+    })
+    for horizon in horizons:
+        increment = cumhaz[np.minimum(tenure + horizon, last)] - cumhaz[tenure]
+        scored[f'ExitRisk{horizon}m'] = -np.expm1(-increment * relative_risk)
+
+    return scored
+
+def score_file(model_path, input_path, output_path, horizons=DEFAULT_HORIZONS,
+               chunk_size=DEFAULT_SCORING_CHUNK_SIZE, compression='zstd', file_format='parquet'):
+    """
+    Score every current employee in a dataset file and stream the results to `output_path`.
+
+    Reading and scoring of the next chunk overlap with writing the previous one.
+    Returns the number of employees scored.
+    """
+    model = load_model(model_path)
+    columns = required_columns(['EmployeeID', 'Tenure', 'EmploymentStatus', *model.feature_names])
+
+    with BackgroundWriter(output_path, compression=compression, file_format=file_format) as writer:
+        for chunk in iter_input(input_path, columns, chunk_size):
+            current = chunk[chunk['EmploymentStatus'] == 'Current']
+            if len(current):
+                writer.write(score_frame(model, current, horizons))
+
+    return writer.rows_written
+
+def main():
+    # Load parameters
+    with open("params.yaml", "r") as params_file:
+        params = yaml.safe_load(params_file)
+
+    scoring_params = params["scoring"]
+    output_path = scoring_params["output_file"]
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    n_scored = score_file(
+        scoring_params["model_path"],
+        scoring_params["input_file"],
+        output_path,
+        horizons=scoring_params.get("horizons", DEFAULT_HORIZONS),
+        chunk_size=scoring_params.get("chunk_size", DEFAULT_SCORING_CHUNK_SIZE),
+        compression=scoring_params.get("compression", "zstd"),
+        file_format=scoring_params.get("format", "parquet"),
+    )
+    print(f"Scored {n_scored} current employees, saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.competing_risks import (
+    _aalen_johansen, _iter_score_residuals, _prepare_stratum, _stratum_terms, cause_codes, fit_fine_gray,
+)
+
+def censoring_before(time, exited, t):
+    """Kaplan-Meier of the censoring distribution just before t, one time at a time"""
+    value = 1.0
+    for s in np.unique(time[time < t]):
+        at_risk = (time >= s).sum()
+        censored = ((time == s) & ~exited).sum()
+        value *= 1 - censored / at_risk
+    return value
+
+def brute_force_fine_gray(X, time, cause, beta):
+    """Weighted risk-set log partial likelihood and score of cause 1 (Breslow ties)"""
+    exited = cause > 0
+    r = np.exp(X @ beta)
+    log_likelihood, score = 0.0, np.zeros(X.shape[1])
+    for i in np.flatnonzero(cause == 1):
+        t = time[i]
+        weight = (time >= t).astype(np.float64)
+        for j in np.flatnonzero((cause > 1) & (time < t)):
+            weight[j] = censoring_before(time, exited, t) / censoring_before(time, exited, time[j])
+        s0 = weight @ r
+        s1 = (weight * r) @ X
+        log_likelihood += X[i] @ beta - np.log(s0)
+        score += X[i] - s1 / s0
+    return log_likelihood, score
+
+def case_weighted_score(X, time, cause, beta, case_weight):
+    """Score of cause 1 with a weight per employee, also in the Kaplan-Meier of the censoring"""
+    exited = cause > 0
+
+    def censoring(t):
+        value = 1.0
+        for s in np.unique(time[time < t]):
+            at_risk = case_weight[time >= s].sum()
+            value *= 1 - case_weight[(time == s) & ~exited].sum() / at_risk
+        return value
+
+    r = np.exp(X @ beta)
+    score = np.zeros(X.shape[1])
+    for i in np.flatnonzero(cause == 1):
+        t = time[i]
+        weight = (time >= t).astype(np.float64)
+        for j in np.flatnonzero((cause > 1) & (time < t)):
+            weight[j] = censoring(t) / censoring(time[j])
+        weight *= case_weight * r
+        score += case_weight[i] * (X[i] - weight @ X / weight.sum())
+    return score
+
+def simulated_stratum(seed, n=80, p=3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, p))
+    time = rng.integers(1, 15, n).astype(np.float64)
+    cause = rng.choice([0, 1, 2], size=n, p=[0.3, 0.4, 0.3])
+    return X, time, cause
+
+@pytest.mark.parametrize('seed', range(5))
+def test_fine_gray_terms_match_brute_force(seed):
+    X, time, cause = simulated_stratum(seed)
+    beta = np.random.default_rng(seed + 100).normal(scale=0.3, size=X.shape[1])
+
+    log_likelihood, score, _ = _stratum_terms(_prepare_stratum(X, time, cause, 1), beta)
+    expected_ll, expected_score = brute_force_fine_gray(X, time, cause, beta)
+
+    assert log_likelihood == pytest.approx(expected_ll, rel=1e-10)
+    np.testing.assert_allclose(score, expected_score, rtol=1e-8, atol=1e-10)
+
+def test_fine_gray_information_is_negative_score_derivative():
+    X, time, cause = simulated_stratum(0)
+    stratum = _prepare_stratum(X, time, cause, 1)
+    beta = np.array([0.2, -0.1, 0.3])
+    step = 1e-6
+
+    _, _, information = _stratum_terms(stratum, beta)
+    numeric = np.column_stack([
+        (_stratum_terms(stratum, beta - step * e)[1] - _stratum_terms(stratum, beta + step * e)[1]) / (2 * step)
+        for e in np.eye(3)
+    ])
+
+    np.testing.assert_allclose(information, numeric, rtol=1e-5, atol=1e-7)
+
+def test_fit_fine_gray_solves_score_equation():
+    X, time, cause = simulated_stratum(1, n=300)
+    df = pd.DataFrame(X, columns=['x0', 'x1', 'x2'])
+    df['Tenure'] = time
+    df['AttritionFlag'] = np.where(cause > 0, 'Yes', 'No')
+    df['TurnoverCategory'] = np.array([None, 'Voluntary', 'Involuntary'])[cause]
+
+    result = fit_fine_gray(df, ['x0', 'x1', 'x2'])
+
+    assert result.converged
+    _, score = brute_force_fine_gray(X, time, cause_codes(df), result.coefficients)
+    np.testing.assert_allclose(score, 0, atol=1e-6)
+
+def test_score_residuals_are_case_weight_derivatives_of_score():
+    # Including the effect of each employee on the estimated censoring weights
+    X, time, cause = simulated_stratum(3, n=50, p=2)
+    beta = np.array([0.3, -0.2])
+    step = 1e-6
+
+    residuals = np.vstack(list(_iter_score_residuals(_prepare_stratum(X, time, cause, 1), beta)))
+    numeric = np.array([
+        (case_weighted_score(X, time, cause, beta, 1 + step * e) - case_weighted_score(X, time, cause, beta, 1 - step * e))
+        / (2 * step)
+        for e in np.eye(len(time))
+    ])
+
+    np.testing.assert_allclose(residuals, numeric, atol=1e-7)
+
+def test_fit_fine_gray_leaves_out_aliased_features():
+    X, time, cause = simulated_stratum(4, n=300)
+    df = pd.DataFrame(X, columns=['x0', 'x1', 'x2'])
+    df['x0_plus_x1'] = df['x0'] + df['x1']
+    df['constant'] = 1.0
+    df['Tenure'] = time
+    df['AttritionFlag'] = np.where(cause > 0, 'Yes', 'No')
+    df['TurnoverCategory'] = np.array([None, 'Voluntary', 'Involuntary'])[cause]
+
+    result = fit_fine_gray(df, ['x0', 'x1', 'x0_plus_x1', 'constant', 'x2'])
+    reduced = fit_fine_gray(df, ['x0', 'x1', 'x2'])
+
+    assert result.converged
+    assert result.aliased_features == ('x0_plus_x1', 'constant')
+    assert np.isnan(result.coefficients[[2, 3]]).all() and np.isnan(result.standard_errors[[2, 3]]).all()
+    np.testing.assert_allclose(result.coefficients[[0, 1, 4]], reduced.coefficients)
+    np.testing.assert_allclose(result.standard_errors[[0, 1, 4]], reduced.standard_errors)
+
+def test_aalen_johansen_matches_step_by_step_estimate():
+    _, time, cause = simulated_stratum(2)
+
+    unique_time, _, _, survival, cif = _aalen_johansen(time.astype(np.int64), cause, 2)
+
+    expected = np.zeros((unique_time.size, 2))
+    overall, total = 1.0, np.zeros(2)
+    for k, t in enumerate(unique_time):
+        at_risk = (time >= t).sum()
+        for c in (1, 2):
+            total[c - 1] += overall * ((time == t) & (cause == c)).sum() / at_risk
+        overall *= 1 - ((time == t) & (cause > 0)).sum() / at_risk
+        expected[k] = total
+        assert survival[k] == pytest.approx(overall)
+
+    np.testing.assert_allclose(cif, expected)
+    # Survival and the cause-specific incidences add up to one
+    np.testing.assert_allclose(survival + cif.sum(axis=1), 1)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.models import evaluation
+from src.models.evaluation import censoring_survival, concordance_index, cumulative_dynamic_auc, survival_before
+
+def pairwise_c_index(time, event, risk):
+    """Harrell's C-index by checking every pair"""
+    concordant = tied = comparable = 0
+    for i in range(len(time)):
+        if not event[i]:
+            continue
+        for j in range(len(time)):
+            if time[i] < time[j] or (time[i] == time[j] and not event[j]):
+                comparable += 1
+                concordant += risk[i] > risk[j]
+                tied += risk[i] == risk[j]
+    return (concordant + 0.5 * tied) / comparable if comparable else np.nan
+
+def pairwise_auc(time, event, risk, horizon, weight):
+    """Cumulative/dynamic AUC at one horizon by checking every case/control pair"""
+    cases = np.flatnonzero(event & (time <= horizon))
+    controls = np.flatnonzero(time > horizon)
+    wins = [(risk[i] > risk[controls]).sum() + 0.5 * (risk[i] == risk[controls]).sum() for i in cases]
+    return (weight[cases] @ wins) / (weight[cases].sum() * controls.size)
+
+@pytest.mark.parametrize('max_sweep_times', [evaluation.MAX_SWEEP_TIMES, 0])
+@pytest.mark.parametrize('seed', range(20))
+def test_concordance_index_matches_pairwise_with_ties(seed, max_sweep_times, monkeypatch):
+    # A limit of 0 sends every input through the block count instead of the sweep
+    monkeypatch.setattr(evaluation, 'MAX_SWEEP_TIMES', max_sweep_times)
+    rng = np.random.default_rng(seed)
+    n = rng.integers(2, 60)
+    time = rng.integers(0, 8, n).astype(np.float64)  # many tied tenures
+    event = rng.random(n) < 0.5
+    risk = rng.integers(0, 5, n)  # many tied scores
+
+    expected = pairwise_c_index(time, event, risk)
+    result = concordance_index(time, event, risk)
+    if np.isnan(expected):
+        assert np.isnan(result)
+    else:
+        assert result == pytest.approx(expected, abs=1e-12)
+
+@pytest.mark.parametrize('n', [300, 3000])
+def test_concordance_index_continuous_times(n):
+    # 3000 distinct tenures is above MAX_SWEEP_TIMES
+    rng = np.random.default_rng(0)
+    time = rng.exponential(size=n)
+    event = rng.random(n) < 0.4
+    risk = rng.normal(size=n) - time
+
+    assert concordance_index(time, event, risk) == pytest.approx(pairwise_c_index(time, event, risk), abs=1e-12)
+
+def test_concordance_index_perfect_and_reversed_ranking():
+    time = np.array([1, 2, 3, 4, 5])
+    event = np.ones(5, dtype=bool)
+
+    assert concordance_index(time, event, -time) == 1.0
+    assert concordance_index(time, event, time) == 0.0
+
+@pytest.mark.parametrize('ipcw', [True, False])
+def test_cumulative_dynamic_auc_matches_pairwise(ipcw):
+    rng = np.random.default_rng(1)
+    n = 200
+    time = rng.integers(0, 40, n)
+    event = rng.random(n) < 0.6
+    risk = rng.integers(0, 10, n) - time / 10
+    horizons = [6, 12, 24]
+
+    if ipcw:
+        censor_time, censor_survival = censoring_survival(time, event)
+        weight = 1 / survival_before(censor_time, censor_survival, time)
+    else:
+        weight = np.ones(n)
+    expected = [pairwise_auc(time, event, risk, horizon, weight) for horizon in horizons]
+
+    np.testing.assert_allclose(cumulative_dynamic_auc(time, event, risk, horizons, ipcw=ipcw), expected, rtol=1e-12)
+
+def test_censoring_survival_is_kaplan_meier_of_censoring():
+    time = np.array([1, 2, 2, 3, 4])
+    event = np.array([True, False, True, False, True])
+
+    unique_time, survival = censoring_survival(time, event)
+
+    np.testing.assert_array_equal(unique_time, [1, 2, 3, 4])
+    # At risk 5, 4, 2, 1; censored 0, 1, 1, 0
+    np.testing.assert_allclose(survival, [1, 3 / 4, 3 / 8, 3 / 8])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.data_generator import generate_hr_dataset, seed_generators
+from src.data.event_log import (
+    ZERO_TENURE_STOP, employee_index, generate_events, iter_event_log, to_counting_process,
+)
+
+@pytest.fixture(scope='module')
+def employees():
+    seed_generators(7)
+    return generate_hr_dataset(600)
+
+@pytest.fixture(scope='module')
+def event_log(employees):
+    np.random.seed(0)
+    events = generate_events(employees)
+    return events, to_counting_process(employees, events)
+
+def per_employee(employees, values, index):
+    """Values keyed by EmployeeIndex, aligned to the rows of employees (NaN where missing)"""
+    return pd.Series(values).groupby(np.asarray(index)).last().reindex(employee_index(employees['EmployeeID']))
+
+def test_promotions_match_snapshot(employees, event_log):
+    events, _ = event_log
+    promotions = events[events['EventType'] == 'Promotion']
+
+    count = promotions.groupby('EmployeeIndex').size().reindex(employee_index(employees['EmployeeID']), fill_value=0)
+    eligible = employees['Tenure'].to_numpy() >= 2
+    expected = np.where(eligible, employees['NumberOfPromotions'], 0)
+    np.testing.assert_array_equal(count.to_numpy(), expected)
+
+    last_level = per_employee(employees, promotions['NewValue'].to_numpy(), promotions['EmployeeIndex'])
+    promoted = expected > 0
+    np.testing.assert_array_equal(last_level.to_numpy()[promoted], employees['JobLevel'].to_numpy()[promoted])
+
+def test_last_salary_change_matches_months_since(employees, event_log):
+    events, _ = event_log
+    salary = events[events['EventType'] == 'SalaryChange']
+
+    last_month = per_employee(employees, salary['Month'].to_numpy(), salary['EmployeeIndex']).to_numpy()
+    last_income = per_employee(employees, salary['NewValue'].to_numpy(), salary['EmployeeIndex']).to_numpy()
+    tenure = employees['Tenure'].to_numpy()
+    since = employees['MonthsSinceLastSalaryChange'].to_numpy()
+    changed = since < tenure
+
+    assert np.isnan(last_month[~changed]).all()
+    np.testing.assert_array_equal(last_month[changed], (tenure - since)[changed])
+    np.testing.assert_allclose(last_income[changed], employees['MonthlyIncome'].to_numpy()[changed])
+
+def test_intervals_cover_tenure_with_one_exit_per_leaver(employees, event_log):
+    _, intervals = event_log
+    tenure = employees['Tenure'].to_numpy()
+
+    assert (intervals['Stop'] > intervals['Start']).all()
+
+    by_employee = intervals.groupby('EmployeeIndex')
+    first_start = by_employee['Start'].first().reindex(employee_index(employees['EmployeeID']))
+    last_stop = by_employee['Stop'].last().reindex(employee_index(employees['EmployeeID']))
+    np.testing.assert_array_equal(first_start, 0)
+    np.testing.assert_allclose(last_stop, np.where(tenure == 0, ZERO_TENURE_STOP, tenure))
+
+    exits = by_employee['Event'].sum().reindex(employee_index(employees['EmployeeID']))
+    np.testing.assert_array_equal(exits, (employees['AttritionFlag'] == 'Yes').astype(int))
+    # The exit is on the last interval
+    assert (by_employee['Event'].last().reindex(employee_index(employees['EmployeeID'])) == exits).all()
+
+def test_iter_event_log_matches_whole_frame(employees, event_log):
+    events, intervals = event_log
+
+    np.random.seed(0)
+    chunks = list(iter_event_log(employees, chunk_size=97))
+
+    assert len(chunks) == 7
+    pd.testing.assert_frame_equal(pd.concat([e for e, _ in chunks], ignore_index=True), events)
+    pd.testing.assert_frame_equal(pd.concat([i for _, i in chunks], ignore_index=True), intervals)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.org_structure import (
+    assign_managers, employment_snapshots, node_depth, subtree_size, subtree_sum, team_attrition_rate, team_size,
+)
+
+def simulated_staff(seed, n=400):
+    rng = np.random.default_rng(seed)
+    hire = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 2500, n), unit='D')
+    stay = pd.to_timedelta(rng.integers(30, 1500, n), unit='D')
+    left = rng.random(n) < 0.4
+    return pd.DataFrame({
+        'EmployeeID': [f'EMP{i:05d}' for i in range(n)],
+        'JobLevel': rng.integers(1, 6, n),
+        'Department': rng.choice(['Finance', 'IT', 'Sales'], n),
+        'Region': rng.choice(['Jakarta', 'Surabaya'], n),
+        'BranchType': rng.choice(['Head Office', 'Branch'], n),
+        'HireDate': hire,
+        'TerminationDate': (hire + stay).where(left),
+    })
+
+@pytest.mark.parametrize('seed', range(3))
+def test_managers_are_senior_same_department_and_overlap(seed):
+    df = simulated_staff(seed)
+    parent = assign_managers(df, max_span=3)
+    reports = np.flatnonzero(parent >= 0)
+    managers = parent[reports]
+    assert reports.size > len(df) / 2
+
+    levels = df['JobLevel'].to_numpy()
+    department = df['Department'].to_numpy()
+    assert (levels[managers] > levels[reports]).all()
+    assert (department[managers] == department[reports]).all()
+
+    hire, termination = df['HireDate'], df['TerminationDate']
+    for report, manager in zip(reports, managers):
+        if pd.isna(termination[report]):
+            assert pd.isna(termination[manager])
+        else:
+            month = termination[report].to_period('M')
+            assert hire[manager] <= month.start_time
+            assert pd.isna(termination[manager]) or termination[manager] >= (month + 1).start_time
+
+@pytest.mark.parametrize('max_span', [1, 3])
+def test_span_of_control_is_capped_per_snapshot(max_span):
+    df = simulated_staff(0)
+    parent = assign_managers(df, max_span=max_span)
+
+    for reports, _ in employment_snapshots(df):
+        chosen = parent[reports]
+        assert np.bincount(chosen[chosen >= 0], minlength=len(df)).max(initial=0) <= max_span
+
+def test_tree_helpers_on_small_tree():
+    #        0         6
+    #      /   \
+    #     1     2
+    #    / \     \
+    #   3   4     5
+    parent = np.array([-1, 0, 0, 1, 1, 2, -1])
+    attrited = np.array([0, 1, 0, 1, 0, 1, 0])
+
+    np.testing.assert_array_equal(node_depth(parent), [0, 1, 1, 2, 2, 2, 0])
+    np.testing.assert_array_equal(team_size(parent), [2, 2, 1, 0, 0, 0, 0])
+    np.testing.assert_array_equal(subtree_sum(parent, [1, 2, 3, 4, 5, 6, 7]), [21, 11, 9, 4, 5, 6, 7])
+    np.testing.assert_array_equal(subtree_size(parent), [6, 3, 2, 1, 1, 1, 1])
+
+    nan = np.nan
+    np.testing.assert_array_equal(team_attrition_rate(parent, attrited), [1 / 2, 1 / 2, 1, nan, nan, nan, nan])
+    np.testing.assert_array_equal(
+        team_attrition_rate(parent, attrited, include_subtree=True), [3 / 5, 1 / 2, 1, nan, nan, nan, nan]
+    )
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.penalized_cox import fit_cox_path
+
+FEATURES = ['x0', 'x1', 'x2', 'x3']
+
+def simulated_cohort(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES)))
+    true_beta = np.array([0.8, -0.5, 0.0, 0.3])
+    event_time = rng.exponential(np.exp(-X @ true_beta))
+    censor_time = rng.exponential(1.5, n)
+    df = pd.DataFrame(X, columns=FEATURES)
+    # Whole tenths of a month, so there are tied times
+    df['Tenure'] = np.round(np.minimum(event_time, censor_time) * 10) / 10
+    df['AttritionFlag'] = np.where(event_time <= censor_time, 'Yes', 'No')
+    return df
+
+def brute_force_score(X, time, event, beta):
+    """Log partial likelihood (Breslow ties) and its gradient, one exit at a time"""
+    r = np.exp(X @ beta)
+    log_likelihood, score = 0.0, np.zeros(X.shape[1])
+    for i in np.flatnonzero(event):
+        at_risk = time >= time[i]
+        log_likelihood += X[i] @ beta - np.log(r[at_risk].sum())
+        score += X[i] - r[at_risk] @ X[at_risk] / r[at_risk].sum()
+    return log_likelihood, score
+
+def brute_force_cox(X, time, event, n_iter=50):
+    """Unpenalized Cox estimate by Newton-Raphson with a finite-difference Hessian"""
+    beta = np.zeros(X.shape[1])
+    for _ in range(n_iter):
+        _, score = brute_force_score(X, time, event, beta)
+        hessian = np.column_stack([
+            (brute_force_score(X, time, event, beta + 1e-6 * e)[1] - score) / 1e-6
+            for e in np.eye(X.shape[1])
+        ])
+        beta = beta - np.linalg.solve(hessian, score)
+    return beta
+
+def test_tiny_lambda_matches_unpenalized_fit():
+    df = simulated_cohort()
+    X = df[FEATURES].to_numpy()
+    time, event = df['Tenure'].to_numpy(), (df['AttritionFlag'] == 'Yes').to_numpy()
+
+    result = fit_cox_path(df, FEATURES, alpha=1.0, n_lambdas=40, lambda_min_ratio=1e-6, n_folds=0)
+
+    np.testing.assert_allclose(result.coefficients[-1], brute_force_cox(X, time, event), atol=1e-3)
+    assert result.log_likelihood[-1] == pytest.approx(brute_force_score(X, time, event, result.coefficients[-1])[0])
+
+@pytest.mark.parametrize('alpha', [1.0, 0.5])
+def test_path_satisfies_kkt_conditions(alpha):
+    df = simulated_cohort(seed=1)
+    X = df[FEATURES].to_numpy()
+    time, event = df['Tenure'].to_numpy(), (df['AttritionFlag'] == 'Yes').to_numpy()
+    scale = X.std(axis=0)
+    X_std = (X - X.mean(axis=0)) / scale
+    n = len(df)
+
+    result = fit_cox_path(df, FEATURES, alpha=alpha, n_lambdas=20, n_folds=0, tol=1e-10)
+
+    # At lambda_max every coefficient is zero
+    assert not result.coefficients[0].any()
+    for lam, coefficients in zip(result.lambdas[::5], result.coefficients[::5]):
+        beta = coefficients * scale
+        gradient = brute_force_score(X_std, time, event, beta)[1] / n
+        active = beta != 0
+        np.testing.assert_allclose(
+            gradient[active],
+            lam * (alpha * np.sign(beta[active]) + (1 - alpha) * beta[active]),
+            atol=1e-5,
+        )
+        assert np.all(np.abs(gradient[~active]) <= lam * alpha + 1e-6)
+
+def test_cross_validation_in_process_pool():
+    df = simulated_cohort(seed=2)
+
+    result = fit_cox_path(df, FEATURES, alpha=1.0, n_lambdas=15, n_folds=3, n_workers=2)
+
+    assert np.isfinite(result.cv_deviance).all()
+    assert np.isfinite(result.cv_se).all()
+    assert result.index_1se <= result.index_min
+    # The null model at lambda_max predicts worse than the selected one
+    assert result.cv_deviance[result.index_min] < result.cv_deviance[0]
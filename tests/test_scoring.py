@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.scoring import RiskModel, breslow_cumulative_hazard, load_model, save_model, score_file, score_frame
+
+def small_model(scale=1.0):
+    return RiskModel(
+        feature_names=('x', 'Department=Sales'),
+        coefficients=np.array([np.log(2), 0.5]),
+        offsets=np.array([1.0, 0.0]),
+        baseline_cumhaz=scale * np.array([0.0, 0.1, 0.3, 0.6, 1.0]),
+    )
+
+def test_breslow_cumulative_hazard_with_tied_months():
+    time = np.array([1.0, 1.5, 2.0, 2.7, 3.2, 0.4])  # months 1, 1, 2, 2, 3, 0
+    event = np.array([True, False, True, True, False, True])
+    linear_predictor = np.log([1, 2, 1, 3, 1, 1])
+
+    cumhaz = breslow_cumulative_hazard(time, event, linear_predictor, max_month=5)
+
+    # Exits over the summed relative risk of everyone still there at each month:
+    # month 0: 1 / 9, month 1: 1 / 8, month 2: 2 / (1 + 3 + 1), month 3 and later: none
+    expected = np.cumsum([1 / 9, 1 / 8, 2 / 5, 0, 0, 0])
+    np.testing.assert_allclose(cumhaz, expected)
+
+def test_score_frame_conditional_risk():
+    df = pd.DataFrame({
+        'EmployeeID': [1, 2, 3, 4],
+        'Tenure': [0, 2, 4, 10],
+        'x': [1.0, 2.0, 0.0, 1.0],
+        'Department': ['IT', 'IT', 'IT', 'Sales'],
+    })
+
+    scored = score_frame(small_model(), df, horizons=[1, 3])
+
+    relative_risk = np.array([1.0, 2.0, 0.5, np.exp(0.5)])
+    np.testing.assert_allclose(scored['RelativeRisk'], relative_risk)
+    # 1 - exp(-(H0(t + h) - H0(t)) * rr), with H0 flat past month 4
+    np.testing.assert_allclose(scored['ExitRisk1m'], 1 - np.exp(-np.array([0.1, 0.3, 0, 0]) * relative_risk))
+    np.testing.assert_allclose(scored['ExitRisk3m'], 1 - np.exp(-np.array([0.6, 0.7, 0, 0]) * relative_risk))
+    assert scored['EmployeeID'].tolist() == [1, 2, 3, 4]
+
+def test_save_load_round_trip_and_cache(tmp_path):
+    path = str(tmp_path / 'model.npz')
+    save_model(small_model(), path)
+
+    model = load_model(path)
+    assert model.feature_names == small_model().feature_names
+    for loaded, saved in zip(model[1:], small_model()[1:]):
+        np.testing.assert_array_equal(loaded, saved)
+    assert load_model(path) is model
+
+    # The cached arrays are shared, so they are read-only
+    with pytest.raises(ValueError):
+        model.baseline_cumhaz[0] = 1.0
+
+    # Saving over the file (with a new modification time) invalidates the cache
+    save_model(small_model(scale=2.0), path)
+    mtime_ns = os.stat(path).st_mtime_ns + 10 ** 9
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    reloaded = load_model(path)
+    assert reloaded is not model
+    np.testing.assert_allclose(reloaded.baseline_cumhaz, 2 * small_model().baseline_cumhaz)
+
+def test_score_file_scores_current_employees_across_chunks(tmp_path):
+    model_path = str(tmp_path / 'model.npz')
+    input_path = str(tmp_path / 'employees.csv')
+    output_path = str(tmp_path / 'scores.csv')
+    save_model(small_model(), model_path)
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'EmployeeID': np.arange(1, 12),
+        'Tenure': rng.integers(0, 8, 11),
+        # Chunks of 3 rows: the second has no current employees
+        'EmploymentStatus': ['Current', 'Terminated', 'Current', 'Terminated', 'Terminated', 'Terminated',
+                             'Current', 'Terminated', 'Current', 'Current', 'Terminated'],
+        'x': rng.normal(size=11),
+        'Department': rng.choice(['IT', 'Sales'], 11),
+    })
+    df.to_csv(input_path, index=False)
+
+    n_scored = score_file(model_path, input_path, output_path, horizons=[3], chunk_size=3,
+                          compression='none', file_format='csv')
+
+    current = df[df['EmploymentStatus'] == 'Current']
+    assert n_scored == len(current)
+    scored = pd.read_csv(output_path)
+    expected = score_frame(small_model(), current, horizons=[3]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(scored, expected, check_dtype=False)
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from src.data.writer import BackgroundWriter
+
+@pytest.mark.parametrize('null_chunk', [0, 1])
+def test_parquet_chunks_with_all_null_text_column(tmp_path, null_chunk):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'out.parquet')
+    chunks = [
+        pd.DataFrame({'EmployeeID': ['EMP00001', 'EMP00002'], 'ManagerID': ['EMP00009', None]}),
+        pd.DataFrame({'EmployeeID': ['EMP00003', 'EMP00004'], 'ManagerID': [None, None]}),
+    ]
+    if null_chunk == 0:
+        chunks.reverse()
+
+    with BackgroundWriter(path, file_format='parquet', compression='none') as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+    result = pd.read_parquet(path)
+    pd.testing.assert_frame_equal(result, pd.concat(chunks, ignore_index=True))